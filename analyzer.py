@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple
 import re
-from functools import lru_cache
 from config import (
     MIN_BET_SIZE, NEW_WALLET_DAYS_HIGH, NEW_WALLET_DAYS_LOW,
     LOW_ACTIVITY_THRESHOLD, LOW_ODDS_THRESHOLD, TIME_TO_RESOLVE_HOURS, SCORES,
-    BLOCK_15MIN_MARKETS, BLOCK_SHORT_PRICE_PREDICTIONS, MAX_ODDS_THRESHOLD
+    BLOCK_15MIN_MARKETS, BLOCK_SHORT_PRICE_PREDICTIONS, MAX_ODDS_THRESHOLD,
+    VERBOSE
 )
+from event_detector_fixed import extract_event_date_from_title
+
+# Outcome spellings treated as a NO position (same as outcome.lower() == "no")
+NO_OUTCOMES = frozenset({"no", "No", "NO", "nO"})
 
 def calculate_wallet_age_days(first_activity_timestamp: int) -> int:
     if not first_activity_timestamp:
@@ -42,7 +46,7 @@ def get_effective_odds(trade_price: float, outcome: str) -> float:
     - YES at 7¢  = contrarian (low odds)
     - NO at 93¢  = safe bet (high odds, low payout)
     """
-    if outcome and outcome.lower() == "no":
+    if outcome in NO_OUTCOMES:
         return 1 - trade_price
     return trade_price
 
@@ -90,81 +94,6 @@ def calculate_activity_score(total_activities: int) -> int:
         return SCORES["low_activity"]
     return 0
 
-@lru_cache(maxsize=100)
-def extract_event_date_from_title(title: str) -> Optional[datetime]:
-    """
-    Extract event date from market title.
-    Patterns: "2026-01-19", "January 19", "Jan 19", "19.01.2026", etc.
-    Returns timezone-aware datetime in UTC.
-    """
-    if not title:
-        return None
-    
-    title_lower = title.lower()
-    
-    # Pattern 1: ISO date (2026-01-19, 2026/01/19)
-    iso_match = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', title)
-    if iso_match:
-        try:
-            year, month, day = int(iso_match.group(1)), int(iso_match.group(2)), int(iso_match.group(3))
-            return datetime(year, month, day, tzinfo=timezone.utc)
-        except:
-            pass
-    
-    # Pattern 2: Reverse date (19-01-2026, 19/01/2026, 19.01.2026)
-    reverse_match = re.search(r'(\d{1,2})[-/\.](\d{1,2})[-/\.](\d{4})', title)
-    if reverse_match:
-        try:
-            day, month, year = int(reverse_match.group(1)), int(reverse_match.group(2)), int(reverse_match.group(3))
-            return datetime(year, month, day, tzinfo=timezone.utc)
-        except:
-            pass
-    
-    # Pattern 3: Month name (January 19, Jan 19, 19 January)
-    months = {
-        'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
-        'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
-        'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sep': 9, 'sept': 9,
-        'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
-    }
-    
-    for month_name, month_num in months.items():
-        # "January 19" or "Jan 19"
-        pattern1 = rf'{month_name}\s+(\d{{1,2}})'
-        match1 = re.search(pattern1, title_lower)
-        if match1:
-            day = int(match1.group(1))
-            year = datetime.now().year
-            
-            # FIX BUG #3: If month already passed this year, use next year
-            current_month = datetime.now().month
-            if month_num < current_month:
-                year += 1
-            
-            try:
-                return datetime(year, month_num, day, tzinfo=timezone.utc)
-            except:
-                pass
-        
-        # "19 January" or "19 Jan"
-        pattern2 = rf'(\d{{1,2}})\s+{month_name}'
-        match2 = re.search(pattern2, title_lower)
-        if match2:
-            day = int(match2.group(1))
-            year = datetime.now().year
-            
-            # FIX BUG #3: If month already passed this year, use next year
-            current_month = datetime.now().month
-            if month_num < current_month:
-                year += 1
-            
-            try:
-                return datetime(year, month_num, day, tzinfo=timezone.utc)
-            except:
-                pass
-    
-    return None
-
 def is_15min_market(market_question: str) -> bool:
     """
     Detect 15-minute interval HFT markets.
@@ -394,19 +323,21 @@ def calculate_score(trade: Dict, wallet_data: Dict, market: Dict) -> Dict:
     outcome = trade.get("outcome", "Yes")
     trade_price = float(trade.get("price", 0))
     effective = get_effective_odds(trade_price, outcome)
-    is_no = outcome and outcome.lower() == "no"
+    is_no = outcome in NO_OUTCOMES
     
-    print(f"     ── Score Breakdown ──")
-    if is_no:
-        print(f"     ⚠️  NO position: raw price={trade_price:.4f}, effective odds={effective:.4f}")
+    if VERBOSE:
+        print(f"     ── Score Breakdown ──")
+        if is_no:
+            print(f"     ⚠️  NO position: raw price={trade_price:.4f}, effective odds={effective:.4f}")
     
     wallet_age_score = calculate_wallet_age_score(wallet_data.get("first_activity_timestamp"))
     if wallet_age_score > 0:
         age_days = calculate_wallet_age_days(wallet_data.get("first_activity_timestamp"))
         score += wallet_age_score
         flags.append(f"New wallet ({age_days}d old)")
-        print(f"     Wallet age: {age_days}d → +{wallet_age_score} pts")
-    else:
+        if VERBOSE:
+            print(f"     Wallet age: {age_days}d → +{wallet_age_score} pts")
+    elif VERBOSE:
         age_days = calculate_wallet_age_days(wallet_data.get("first_activity_timestamp"))
         print(f"     Wallet age: {age_days}d → 0 pts (too old)")
     
@@ -416,11 +347,13 @@ def calculate_score(trade: Dict, wallet_data: Dict, market: Dict) -> Dict:
         score += against_trend_score
         if effective < LOW_ODDS_THRESHOLD:
             flags.append(f"Against trend ({effective*100:.1f}% effective odds)")
-            print(f"     Against trend: {effective*100:.1f}% effective → +{against_trend_score} pts (contrarian)")
+            if VERBOSE:
+                print(f"     Against trend: {effective*100:.1f}% effective → +{against_trend_score} pts (contrarian)")
         else:  # > 95%
             flags.append(f"Extreme confidence ({effective*100:.1f}% effective odds)")
-            print(f"     Extreme confidence: {effective*100:.1f}% effective → +{against_trend_score} pts")
-    else:
+            if VERBOSE:
+                print(f"     Extreme confidence: {effective*100:.1f}% effective → +{against_trend_score} pts")
+    elif VERBOSE:
         print(f"     Odds: {effective*100:.1f}% effective → 0 pts (middle range)")
     
     # FIX: For NO positions, amount is calculated in detector.py with correct formula
@@ -434,8 +367,9 @@ def calculate_score(trade: Dict, wallet_data: Dict, market: Dict) -> Dict:
     if bet_size_score > 0:
         score += bet_size_score
         flags.append(f"Large bet (${amount:,.0f})")
-        print(f"     Bet size: ${amount:,.0f} → +{bet_size_score} pts")
-    else:
+        if VERBOSE:
+            print(f"     Bet size: ${amount:,.0f} → +{bet_size_score} pts")
+    elif VERBOSE:
         print(f"     Bet size: ${amount:,.0f} → 0 pts")
     
     end_date = market.get("endDate")
@@ -446,10 +380,11 @@ def calculate_score(trade: Dict, wallet_data: Dict, market: Dict) -> Dict:
             end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
             hours = (end_dt - datetime.now(timezone.utc)).total_seconds() / 3600
             flags.append(f"Close to deadline ({hours:.0f}h)")
-            print(f"     Timing: {hours:.0f}h until resolve → +{timing_score} pts")
+            if VERBOSE:
+                print(f"     Timing: {hours:.0f}h until resolve → +{timing_score} pts")
         except:
             pass
-    else:
+    elif VERBOSE:
         try:
             if end_date:
                 end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
@@ -465,12 +400,14 @@ def calculate_score(trade: Dict, wallet_data: Dict, market: Dict) -> Dict:
     if activity_score > 0:
         score += activity_score
         flags.append(f"Low activity ({total_activities} txns)")
-        print(f"     Activity: {total_activities} txns → +{activity_score} pts")
-    else:
+        if VERBOSE:
+            print(f"     Activity: {total_activities} txns → +{activity_score} pts")
+    elif VERBOSE:
         print(f"     Activity: {total_activities} txns → 0 pts (too many)")
     
-    print(f"     ────────────────────")
-    print(f"     TOTAL: {score} pts")
+    if VERBOSE:
+        print(f"     ────────────────────")
+        print(f"     TOTAL: {score} pts")
     
     # FIX: Calculate correct PnL for both YES and NO
     if is_no:
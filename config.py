@@ -54,9 +54,24 @@ RETRY_BACKOFF = 2           # Exponential backoff multiplier
 RATE_LIMIT_RETRY_DELAY = 60  # Wait time for 429 errors (seconds)
 RATE_LIMIT_MAX_RETRIES = 2   # Max retries for rate limit errors
 
+# Wallet Activity Prefetch
+WALLET_FETCH_WORKERS = 8     # Concurrent /activity requests (keep low, data API rate-limits)
+
+# Telegram Delivery
+TELEGRAM_SEND_WORKERS = 3    # Concurrent sendMessage calls (Telegram throttles bursts per chat)
+ALERT_DEDUP_WINDOW = 1800    # Seconds a sent alert blocks near-duplicates (market, wallet, side, ~amount); spans the MINUTES_BACK overlap
+
+# LLM Response Cache
+LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached OpenAI factor analysis is reused
+
 # Execution Limits
 MAX_EXECUTION_TIME = 1800   # 30 minutes max execution (seconds)
 
+# Logging
+# Per-trade diagnostics (trade details, score breakdowns) are only built and
+# printed when DETECTOR_VERBOSE=1; alerts, filters and summaries always print
+VERBOSE = os.getenv("DETECTOR_VERBOSE", "0") == "1"
+
 # Environment Variables
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
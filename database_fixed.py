@@ -5,6 +5,7 @@ import os
 from pathlib import Path
 import shutil
 import threading
+import time
 
 # FIX BUG #2: Persistent database path
 # Use home directory for persistence across GitHub Actions runs
@@ -22,13 +23,21 @@ def get_db_connection():
     """
     if not hasattr(local, 'conn') or local.conn is None:
         local.conn = sqlite3.connect(
-            str(DB_PATH), 
+            str(DB_PATH),
             timeout=30,
-            check_same_thread=False
+            check_same_thread=False,
+            cached_statements=256  # helpers reuse a fixed set of SQL strings
         )
         # Enable WAL mode for concurrent access
         local.conn.execute("PRAGMA journal_mode=WAL")
         local.conn.execute("PRAGMA busy_timeout=30000")
+        # Performance tuning for the detector hot loop:
+        # NORMAL is durable under WAL (fsync per checkpoint, not per commit),
+        # 64MB page cache, temp tables in memory, reads via mmap (256MB)
+        local.conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn.execute("PRAGMA cache_size=-65536")
+        local.conn.execute("PRAGMA temp_store=MEMORY")
+        local.conn.execute("PRAGMA mmap_size=268435456")
     return local.conn
 
 def backup_database():
@@ -151,6 +160,15 @@ def init_database():
             ON alert_history(trade_hash)
         """)
         
+        # Cached LLM responses (avoid re-querying OpenAI for markets seen before)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        
         # Schema versioning for future migrations
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS schema_version (
@@ -191,16 +209,7 @@ def get_wallet_stats(wallet: str) -> Optional[Dict]:
         row = cursor.fetchone()
         
         if row:
-            return {
-                'total_trades': row[0],
-                'pre_event_trades': row[1],
-                'total_volume': row[2],
-                'avg_latency_seconds': row[3],
-                'insider_score': row[4],
-                'classification': row[5],
-                'first_seen': row[6],
-                'last_updated': row[7]
-            }
+            return _wallet_stats_from_row(row)
         
         return None
         
@@ -208,6 +217,52 @@ def get_wallet_stats(wallet: str) -> Optional[Dict]:
         print(f"[{datetime.now()}] ❌ Database error in get_wallet_stats: {e}")
         return None
 
+def get_wallet_stats_many(wallets: List[str], chunk_size: int = 900) -> Dict[str, Dict]:
+    """
+    Get performance statistics for many wallets at once.
+    Uses chunked IN queries (below SQLite's 999 variable limit) instead of
+    one query per wallet. Wallets without history are absent from the result.
+    """
+    stats = {}
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        for start in range(0, len(wallets), chunk_size):
+            chunk = wallets[start:start + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT 
+                    total_trades, pre_event_trades, 
+                    total_volume, avg_latency_seconds, 
+                    insider_score, classification,
+                    first_seen, last_updated, wallet
+                FROM wallet_performance
+                WHERE wallet IN ({placeholders})
+            """, chunk)
+            
+            for row in cursor.fetchall():
+                stats[row[8]] = _wallet_stats_from_row(row)
+        
+        return stats
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in get_wallet_stats_many: {e}")
+        return stats
+
+def _wallet_stats_from_row(row) -> Dict:
+    """Map a wallet_performance row (column order as in get_wallet_stats) to a dict."""
+    return {
+        'total_trades': row[0],
+        'pre_event_trades': row[1],
+        'total_volume': row[2],
+        'avg_latency_seconds': row[3],
+        'insider_score': row[4],
+        'classification': row[5],
+        'first_seen': row[6],
+        'last_updated': row[7]
+    }
+
 def update_wallet_stats(wallet: str, trade_data: Dict):
     """
     Update wallet statistics with new trade.
@@ -342,6 +397,176 @@ def save_trade(trade_data: Dict) -> bool:
         print(f"[{datetime.now()}] ❌ Database error in save_trade: {e}")
         return False
 
+def save_trades_bulk(trade_records: List[Dict]) -> int:
+    """
+    Save many trades to history in a single transaction.
+    Applies the same validation as save_trade(); duplicates are ignored.
+    Unlike save_trade(), trade_timestamp is epoch seconds and event_timestamp
+    an ISO string; SQLite converts both to the same stored text as the
+    datetime adapter would, so no datetime objects are built per row.
+    Returns number of rows inserted.
+    """
+    rows = []
+    for trade_data in trade_records:
+        if trade_data.get('size', 0) <= 0:
+            print(f"[{datetime.now()}] ⚠️ Invalid trade size: {trade_data.get('size')}")
+            continue
+        
+        odds = trade_data.get('odds', 0)
+        if not (0 <= odds <= 1):
+            print(f"[{datetime.now()}] ⚠️ Invalid odds: {odds}")
+            continue
+        
+        rows.append((
+            trade_data.get('wallet'),
+            trade_data.get('market'),
+            trade_data.get('trade_timestamp'),
+            trade_data.get('event_timestamp'),
+            trade_data.get('latency_seconds'),
+            trade_data.get('position'),
+            trade_data.get('size'),
+            trade_data.get('odds'),
+            1 if trade_data.get('is_pre_event') else 0,
+            trade_data.get('trade_hash')
+        ))
+    
+    if not rows:
+        return 0
+    
+    try:
+        conn = get_db_connection()
+        changes_before = conn.total_changes
+        
+        with conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO trade_history 
+                (wallet, market, trade_timestamp, event_timestamp, latency_seconds,
+                 position, size, odds, is_pre_event, trade_hash)
+                VALUES (?, ?, strftime('%Y-%m-%d %H:%M:%S+00:00', ?, 'unixepoch'),
+                        replace(?, 'T', ' '), ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        return conn.total_changes - changes_before
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in save_trades_bulk: {e}")
+        return 0
+
+def _fold_wallet_trades(current: Optional[tuple], trades: List[Dict]) -> tuple:
+    """
+    Apply trades in order to a wallet's (total_trades, pre_event_trades,
+    total_volume, avg_latency_seconds), same arithmetic as update_wallet_stats().
+    current is None for a wallet not yet in wallet_performance.
+    """
+    if current is None:
+        first = trades[0]
+        total_trades = 1
+        pre_event_trades = 1 if first.get('is_pre_event') else 0
+        total_volume = first.get('size', 0)
+        avg_latency = first.get('latency_seconds') or 0
+        trades = trades[1:]
+    else:
+        total_trades, pre_event_trades, total_volume, avg_latency = current
+        avg_latency = avg_latency or 0
+    
+    for trade_data in trades:
+        previous_total = total_trades
+        total_trades += 1
+        pre_event_trades += 1 if trade_data.get('is_pre_event') else 0
+        total_volume += trade_data.get('size', 0)
+        
+        latency = trade_data.get('latency_seconds')
+        if latency and latency > 0:
+            avg_latency = (avg_latency * previous_total + latency) / total_trades
+    
+    return total_trades, pre_event_trades, total_volume, avg_latency
+
+def update_wallet_stats_bulk(updates: List[tuple], chunk_size: int = 900):
+    """
+    Update statistics for many wallets in a single exclusive transaction.
+    updates: (wallet, trade_data) pairs in trade order, trade_data as for
+    update_wallet_stats(). Per-wallet deltas are folded in Python first.
+    """
+    if not updates:
+        return
+    
+    by_wallet = {}
+    for wallet, trade_data in updates:
+        by_wallet.setdefault(wallet, []).append(trade_data)
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        conn.execute("BEGIN EXCLUSIVE")
+        cursor = conn.cursor()
+        
+        wallets = list(by_wallet)
+        existing = {}
+        for start in range(0, len(wallets), chunk_size):
+            chunk = wallets[start:start + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT wallet, total_trades, pre_event_trades, total_volume, avg_latency_seconds
+                FROM wallet_performance
+                WHERE wallet IN ({placeholders})
+            """, chunk)
+            for row in cursor.fetchall():
+                existing[row[0]] = row[1:]
+        
+        now = datetime.now(timezone.utc)
+        update_rows = []
+        insert_rows = []
+        for wallet, trades in by_wallet.items():
+            current = existing.get(wallet)
+            total_trades, pre_event_trades, total_volume, avg_latency = _fold_wallet_trades(current, trades)
+            
+            if current is None and total_trades == 1:
+                # Same defaults as a fresh insert in update_wallet_stats()
+                insider_score, classification = 0, 'New'
+            else:
+                insider_score = calculate_insider_score(
+                    pre_event_trades=pre_event_trades,
+                    total_trades=total_trades,
+                    avg_latency=avg_latency
+                )
+                classification = classify_wallet(insider_score, pre_event_trades, total_trades)
+            
+            if current is None:
+                insert_rows.append((
+                    wallet, total_trades, pre_event_trades, total_volume,
+                    avg_latency, now, now, insider_score, classification
+                ))
+            else:
+                update_rows.append((
+                    total_trades, pre_event_trades,
+                    total_volume, avg_latency,
+                    insider_score, classification,
+                    now, wallet
+                ))
+        
+        cursor.executemany("""
+            UPDATE wallet_performance 
+            SET total_trades = ?, pre_event_trades = ?,
+                total_volume = ?, avg_latency_seconds = ?,
+                insider_score = ?, classification = ?,
+                last_updated = ?
+            WHERE wallet = ?
+        """, update_rows)
+        
+        cursor.executemany("""
+            INSERT INTO wallet_performance 
+            (wallet, total_trades, pre_event_trades, total_volume, 
+             avg_latency_seconds, first_seen, last_updated, insider_score, classification)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, insert_rows)
+        
+        conn.commit()
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in update_wallet_stats_bulk: {e}")
+        if conn is not None:
+            conn.rollback()
+
 def is_alert_sent(wallet: str, trade_hash: str) -> bool:
     """
     Check if alert already sent for this trade.
@@ -363,6 +588,32 @@ def is_alert_sent(wallet: str, trade_hash: str) -> bool:
         print(f"[{datetime.now()}] ❌ Database error in is_alert_sent: {e}")
         return False
 
+def get_sent_alerts_set(trade_hashes: List[str], chunk_size: int = 900) -> set:
+    """
+    Get the (wallet, trade_hash) pairs already alerted among trade_hashes.
+    Uses chunked IN queries so a whole batch is checked in a few round-trips.
+    """
+    sent = set()
+    hashes = list(set(trade_hashes))
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT wallet, trade_hash FROM alert_history
+                WHERE trade_hash IN ({placeholders})
+            """, chunk)
+            sent.update(cursor.fetchall())
+        
+        return sent
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in get_sent_alerts_set: {e}")
+        return sent
+
 def mark_alert_sent(wallet: str, market: str, trade_hash: str, insider_score: float, latency_seconds: float = None):
     """
     Mark alert as sent.
@@ -383,6 +634,59 @@ def mark_alert_sent(wallet: str, market: str, trade_hash: str, insider_score: fl
     except sqlite3.Error as e:
         print(f"[{datetime.now()}] ❌ Database error in mark_alert_sent: {e}")
 
+def mark_alerts_sent_bulk(rows: List[tuple]):
+    """
+    Mark several alerts as sent in a single transaction.
+    rows: (wallet, market, trade_hash, insider_score, latency_seconds) tuples.
+    """
+    if not rows:
+        return
+    
+    try:
+        conn = get_db_connection()
+        now = datetime.now(timezone.utc)
+        
+        with conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO alert_history 
+                (wallet, market, trade_hash, alert_timestamp, insider_score, latency_seconds, sent)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            """, [(wallet, market, trade_hash, now, insider_score, latency_seconds)
+                  for wallet, market, trade_hash, insider_score, latency_seconds in rows])
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in mark_alerts_sent_bulk: {e}")
+
+def get_llm_cache(cache_key: str, max_age_seconds: float) -> Optional[str]:
+    """
+    Get a cached LLM response if it is younger than max_age_seconds.
+    Returns None on a miss, an expired entry or a database error.
+    """
+    try:
+        conn = get_db_connection()
+        row = conn.execute(
+            "SELECT response FROM llm_cache WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, time.time() - max_age_seconds)
+        ).fetchone()
+        return row[0] if row else None
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in get_llm_cache: {e}")
+        return None
+
+def set_llm_cache(cache_key: str, response: str):
+    """Store (or refresh) a cached LLM response."""
+    try:
+        conn = get_db_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, response, created_at) VALUES (?, ?, ?)",
+                (cache_key, response, time.time())
+            )
+        
+    except sqlite3.Error as e:
+        print(f"[{datetime.now()}] ❌ Database error in set_llm_cache: {e}")
+
 def get_recent_alerts_for_market(market: str, hours: int = 6) -> List[Dict]:
     """
     Get recent alerts for a specific market (for coordinated attack detection).
@@ -1,20 +1,86 @@
-from datetime import datetime, timezone
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
 import re
-from collector import get_active_markets, get_recent_trades_paginated, get_wallet_activity, get_market_by_condition_id
-from analyzer import calculate_score, should_skip_alert
+from collector import get_active_markets, get_recent_trades_paginated, get_wallet_activity
+from analyzer import calculate_score, should_skip_alert, NO_OUTCOMES
 from event_detector_fixed import detect_pre_event_trade, calculate_latency_score, get_latency_insight
 from database_fixed import (
-    init_database, get_wallet_stats, update_wallet_stats, 
-    save_trade, is_alert_sent, mark_alert_sent
+    init_database, get_wallet_stats_many, update_wallet_stats_bulk,
+    save_trades_bulk, get_sent_alerts_set, mark_alerts_sent_bulk,
+    get_recent_alerts_for_market
 )
+from irrationality import analyze_market_irrationality
 from config import (
     ALERT_THRESHOLD,
     MIN_BET_SIZE,
     COMBINED_SIGNAL_MIN_STRENGTH,
     CONFLICT_MIN_INSIDER_SCORE,
     INSIDER_ONLY_REQUIRES_PRE_EVENT,
+    WALLET_FETCH_WORKERS,
 )
 
+logger = logging.getLogger(__name__)
+
+# Trailing numeric suffix on trade slugs (e.g. "-12-34") stripped for fallback markets
+_SLUG_RE = re.compile(r'-\d{1,3}-\d{1,3}$')
+
+def history_score_for(wallet_stats) -> tuple:
+    """Score bonus (and flag) for wallets with a suspicious track record."""
+    if wallet_stats and wallet_stats['total_trades'] >= 3:
+        if wallet_stats['insider_score'] >= 70:
+            return 20, f"Known insider (score: {wallet_stats['insider_score']:.0f})"
+        elif wallet_stats['insider_score'] >= 50:
+            return 10, f"Suspicious history (score: {wallet_stats['insider_score']:.0f})"
+    return 0, None
+
+def build_trade_writes(trade, wallet_address, market, outcome, amount, effective_odds, trade_hash, latency_data) -> tuple:
+    """Build the trade_history record and wallet stats delta for a processed trade."""
+    trade_record = {
+        'wallet': wallet_address,
+        'market': market.get('question'),
+        'trade_timestamp': trade.get('timestamp'),  # epoch seconds, converted in SQL
+        'event_timestamp': latency_data.event_time if latency_data else None,  # ISO string
+        'latency_seconds': latency_data.latency_seconds if latency_data else None,
+        'position': outcome,  # FIX: use actual outcome, not trade.get('outcome', 'Unknown')
+        'size': amount,       # FIX: correct amount for NO positions
+        'odds': effective_odds,  # FIX: effective odds
+        'is_pre_event': latency_data is not None,
+        'trade_hash': trade_hash
+    }
+    wallet_delta = {
+        'size': amount,  # FIX: correct amount
+        'is_pre_event': latency_data is not None,
+        'latency_seconds': latency_data.latency_seconds if latency_data else None
+    }
+    return trade_record, (wallet_address, wallet_delta)
+
+def prefetch_wallet_activity(wallets) -> dict:
+    """
+    Fetch activity for many wallets concurrently.
+    Returns {wallet: activity}; wallets whose fetch failed are left out
+    so the caller can retry them inline.
+    """
+    if not wallets:
+        return {}
+    
+    start = datetime.now()
+    logger.info("[%s] Prefetching activity for %d wallets (%d workers)...", start, len(wallets), WALLET_FETCH_WORKERS)
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=WALLET_FETCH_WORKERS) as executor:
+        futures = {executor.submit(get_wallet_activity, wallet): wallet for wallet in wallets}
+        for future in as_completed(futures):
+            wallet = futures[future]
+            try:
+                results[wallet] = future.result()
+            except Exception as e:
+                logger.error("  ❌ Error prefetching activity for %s...: %s", wallet[:8], e)
+    
+    elapsed = (datetime.now() - start).total_seconds()
+    logger.info("[%s] Prefetched activity for %d wallets in %.1fs", datetime.now(), len(results), elapsed)
+    return results
+
 def detect_insider_trades():
     """
     Main detection function with event latency and wallet tracking.
@@ -33,35 +99,19 @@ def detect_insider_trades():
         # Fetch markets
         markets = get_active_markets(limit=50)
         if not markets:
-            print(f"[{datetime.now()}] ⚠️  WARNING: No markets fetched, aborting")
+            logger.warning("[%s] ⚠️  WARNING: No markets fetched, aborting", datetime.now())
             return []
         
-        print(f"[{datetime.now()}] Found {len(markets)} active markets")
+        logger.info("[%s] Found %d active markets", datetime.now(), len(markets))
         
         # Fetch trades with pagination
         trades = get_recent_trades_paginated(markets)
         
         if not trades:
-            print(f"[{datetime.now()}] ⚠️  WARNING: No trades fetched")
+            logger.warning("[%s] ⚠️  WARNING: No trades fetched", datetime.now())
             return []
         
-        print(f"[{datetime.now()}] Analyzing {len(trades)} trades...")
-        
-        # Pre-fetch wallet stats for all unique wallets (batch operation)
-        print(f"[{datetime.now()}] Pre-fetching wallet stats for batch processing...")
-        unique_wallets = set()
-        for trade in trades:
-            wallet = trade.get("proxyWallet")
-            if wallet:
-                unique_wallets.add(wallet)
-        
-        wallet_stats_cache = {}
-        for wallet in unique_wallets:
-            stats = get_wallet_stats(wallet)
-            if stats:
-                wallet_stats_cache[wallet] = stats
-        
-        print(f"[{datetime.now()}] Cached stats for {len(wallet_stats_cache)} wallets")
+        logger.info("[%s] Analyzing %d trades...", datetime.now(), len(trades))
         
         # Analysis counters
         processed_count = 0
@@ -78,43 +128,112 @@ def detect_insider_trades():
         error_count = 0
         debug_printed = False
         
+        # Per-trade diagnostics are logged at DEBUG; check the level once so
+        # multi-line blocks are skipped entirely when it's disabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Alerts are marked as sent in one transaction after the loop;
+        # these track the pending ones so same-run checks still see them
+        pending_mark = []
+        pending_by_market = {}
+        
+        # Trade history and wallet stat writes, flushed in bulk after the loop
+        trade_records = []
+        wallet_updates = []
+        
+        # Index markets by condition ID for O(1) lookup per trade
+        # (reversed so the first market wins, like get_market_by_condition_id)
+        markets_by_cid = {m.get("conditionId"): m for m in reversed(markets) if m.get("conditionId")}
+        
+        # Recent alerts per market question; the 6h window is fixed for the run
+        recent_alerts_cache = {}
+        
+        # ══════════════════════════════════════════════════
+        # Numeric prefilter: amount/price validation and MIN_BET_SIZE
+        # in one tight pass, so the heavy loop below only sees candidates.
+        # The same pass collects candidate wallets and trade hashes for
+        # the batch DB lookups below.
+        # ══════════════════════════════════════════════════
+        candidates = []
+        unique_wallets = set()
+        trade_hashes = []
         for idx, trade in enumerate(trades):
             try:
-                # Extract basic trade info
                 size = float(trade.get("size", 0))
                 price = float(trade.get("price", 0))
-                outcome = trade.get("outcome", "Yes")
-                
-                # ══════════════════════════════════════════════════
-                # FIX: Correct amount calculation for NO positions
-                # API returns YES token price for all trades.
-                # YES: cost = size * price
-                # NO:  cost = size * (1 - price)
-                # ══════════════════════════════════════════════════
-                is_no = outcome and outcome.lower() == "no"
-                if is_no:
-                    amount = size * (1 - price)  # NO token cost
-                else:
-                    amount = size * price         # YES token cost
-                
-                # Validate data before processing
-                if amount <= 0:
-                    filtered_invalid_data += 1
-                    continue
-                
-                if not (0 <= price <= 1):
-                    filtered_invalid_data += 1
-                    continue
-                
-                # Log progress every 100 trades
-                if (idx + 1) % 100 == 0:
-                    elapsed = (datetime.now() - execution_start).total_seconds()
-                    print(f"[{datetime.now()}] Progress: {idx + 1}/{len(trades)} trades ({elapsed:.1f}s elapsed)")
-                
-                # Filter by minimum bet size
-                if amount < MIN_BET_SIZE:
-                    filtered_small += 1
-                    continue
+            except (TypeError, ValueError):
+                filtered_invalid_data += 1
+                continue
+            outcome = trade.get("outcome", "Yes")
+            
+            # ══════════════════════════════════════════════════
+            # FIX: Correct amount calculation for NO positions
+            # API returns YES token price for all trades.
+            # YES: cost = size * price
+            # NO:  cost = size * (1 - price)
+            # ══════════════════════════════════════════════════
+            is_no = outcome in NO_OUTCOMES
+            amount = size * (1 - price) if is_no else size * price
+            
+            # Validate data before processing
+            if amount <= 0 or not (0 <= price <= 1):
+                filtered_invalid_data += 1
+                continue
+            
+            # Filter by minimum bet size
+            if amount < MIN_BET_SIZE:
+                filtered_small += 1
+                continue
+            
+            effective_odds = (1 - price) if is_no else price
+            candidates.append((idx, trade, size, price, outcome, is_no, amount, effective_odds))
+            
+            wallet = trade.get("proxyWallet")
+            if wallet:
+                unique_wallets.add(wallet)
+            trade_hashes.append(trade.get("transactionHash", ""))
+        
+        logger.info("[%s] %d trades passed size/price prefilter", datetime.now(), len(candidates))
+        
+        # Pre-fetch wallet stats for candidate wallets (batch operation)
+        wallet_stats_cache = get_wallet_stats_many(list(unique_wallets))
+        logger.info("[%s] Cached stats for %d wallets", datetime.now(), len(wallet_stats_cache))
+        
+        # ══════════════════════════════════════════════════
+        # Prefetch wallet activity concurrently for every wallet the
+        # loop can reach (has wallet + condition ID, not already alerted)
+        # ══════════════════════════════════════════════════
+        # (wallet, trade_hash) pairs already alerted, loaded for the whole batch
+        sent_alerts = get_sent_alerts_set(trade_hashes)
+        
+        wallets_to_fetch = set()
+        for _, trade, *_ in candidates:
+            wallet = trade.get("proxyWallet")
+            if (wallet and trade.get("conditionId")
+                    and (wallet, trade.get("transactionHash", "")) not in sent_alerts):
+                wallets_to_fetch.add(wallet)
+        
+        wallet_activity_cache = prefetch_wallet_activity(wallets_to_fetch)
+        
+        # Group candidates by wallet (stable, so each wallet's trades keep
+        # their order) so per-wallet stats, history bonus and activity are
+        # looked up once per wallet instead of once per trade
+        candidates.sort(key=lambda c: c[1].get("proxyWallet") or "")
+        current_wallet = None
+        
+        # Log progress at every 10% of candidates (with throughput)
+        step = max(1, len(candidates) // 10)
+        progress_steps = set(range(step, len(candidates) + 1, step))
+        
+        for pos, (idx, trade, size, price, outcome, is_no, amount, effective_odds) in enumerate(candidates):
+            # One timestamp per iteration for log prefixes and the alert record
+            now = datetime.now()
+            try:
+                if pos + 1 in progress_steps:
+                    elapsed = (now - execution_start).total_seconds()
+                    rate = (pos + 1) / elapsed if elapsed > 0 else 0
+                    logger.info("[%s] Progress: %d/%d trades (%.1fs elapsed, %.1f trades/s)",
+                                now, pos + 1, len(candidates), elapsed, rate)
                 
                 # Extract wallet address
                 wallet_address = trade.get("proxyWallet")
@@ -122,6 +241,12 @@ def detect_insider_trades():
                     filtered_no_wallet += 1
                     continue
                 
+                if wallet_address != current_wallet:
+                    current_wallet = wallet_address
+                    wallet_stats = wallet_stats_cache.get(wallet_address)
+                    history_score, history_flag = history_score_for(wallet_stats)
+                    wallet_data = None  # fetched on first use
+                
                 # Extract condition ID
                 condition_id = trade.get("conditionId")
                 if not condition_id:
@@ -129,10 +254,10 @@ def detect_insider_trades():
                     continue
                 
                 # Find market
-                market = get_market_by_condition_id(condition_id, markets)
+                market = markets_by_cid.get(condition_id)
                 if not market:
                     raw_slug = trade.get("slug", "")
-                    clean_slug = re.sub(r'-\d{1,3}-\d{1,3}$', '', raw_slug)
+                    clean_slug = _SLUG_RE.sub('', raw_slug)
                     
                     market = {
                         "question": trade.get("title", "Unknown market"),
@@ -144,87 +269,89 @@ def detect_insider_trades():
                 
                 # Check for duplicate alert
                 trade_hash = trade.get("transactionHash", "")
-                if is_alert_sent(wallet_address, trade_hash):
+                if (wallet_address, trade_hash) in sent_alerts:
                     filtered_duplicate += 1
                     continue
                 
                 # Log high-value trades (show position type)
                 position_label = "NO" if is_no else "YES"
-                effective_odds = (1 - price) if is_no else price
-                print(f"\n[{datetime.now()}] 💰 Large trade: ${amount:,.0f} ({position_label})")
-                print(f"  Wallet: {wallet_address[:8]}...{wallet_address[-4:]}")
-                print(f"  Market: {market.get('question', 'Unknown')[:60]}...")
-                print(f"  Position: {position_label} @ {effective_odds*100:.1f}% effective odds (raw price: {price:.4f})")
+                if debug:
+                    logger.debug("\n[%s] 💰 Large trade: $%s (%s)", now, format(amount, ",.0f"), position_label)
+                    logger.debug("  Wallet: %s...%s", wallet_address[:8], wallet_address[-4:])
+                    logger.debug("  Market: %s...", market.get('question', 'Unknown')[:60])
+                    logger.debug("  Position: %s @ %.1f%% effective odds (raw price: %.4f)", position_label, effective_odds * 100, price)
                 
                 # DEBUG: Print trade structure once
-                if not debug_printed:
-                    print(f"\n  ═══ DEBUG: TRADE OBJECT STRUCTURE ═══")
-                    print(f"  Available keys: {list(trade.keys())}")
-                    print(f"  Sample trade data (first 10 fields):")
+                if debug and not debug_printed:
+                    logger.debug("\n  ═══ DEBUG: TRADE OBJECT STRUCTURE ═══")
+                    logger.debug("  Available keys: %s", list(trade.keys()))
+                    logger.debug("  Sample trade data (first 10 fields):")
                     for key, value in list(trade.items())[:10]:
-                        print(f"    {key}: {value}")
-                    print(f"  ═══════════════════════════════════════\n")
+                        logger.debug("    %s: %s", key, value)
+                    logger.debug("  ═══════════════════════════════════════\n")
                     debug_printed = True
                 
                 # Event Latency Detection
                 latency_data = detect_pre_event_trade(trade, market)
                 if latency_data:
                     pre_event_detected += 1
-                    print(f"  {get_latency_insight(latency_data)}")
-                    print(f"     Trade time: {latency_data['trade_time']}")
-                    print(f"     Event time: {latency_data['event_time']}")
+                    if debug:
+                        logger.debug("  %s", get_latency_insight(latency_data))
+                        logger.debug("     Trade time: %s", latency_data.trade_time)
+                        logger.debug("     Event time: %s", latency_data.event_time)
                 
-                # Get Wallet Historical Stats (from cache)
-                wallet_stats = wallet_stats_cache.get(wallet_address)
-                if wallet_stats:
-                    print(f"  📊 Wallet History:")
-                    print(f"     Total trades: {wallet_stats['total_trades']}")
-                    print(f"     Pre-event trades: {wallet_stats['pre_event_trades']}")
-                    print(f"     Insider Score: {wallet_stats['insider_score']:.1f}")
-                    print(f"     Classification: {wallet_stats['classification']}")
+                latency_score = calculate_latency_score(latency_data.latency_seconds) if latency_data else 0
+                
+                # Wallet Historical Stats (looked up once per wallet group)
+                if debug and wallet_stats:
+                    logger.debug("  📊 Wallet History:")
+                    logger.debug("     Total trades: %s", wallet_stats['total_trades'])
+                    logger.debug("     Pre-event trades: %s", wallet_stats['pre_event_trades'])
+                    logger.debug("     Insider Score: %.1f", wallet_stats['insider_score'])
+                    logger.debug("     Classification: %s", wallet_stats['classification'])
                 
                 # Fetch wallet activity
-                print(f"  → Fetching wallet activity...")
-                wallet_data = get_wallet_activity(wallet_address)
+                logger.debug("  → Fetching wallet activity...")
+                if wallet_data is None:
+                    wallet_data = wallet_activity_cache.get(wallet_address)
+                    if wallet_data is None:
+                        # Prefetch missed/failed: fetch inline once, reuse for this wallet's other trades
+                        wallet_data = get_wallet_activity(wallet_address)
+                        wallet_activity_cache[wallet_address] = wallet_data
                 
                 if wallet_data.get('total_count', 0) == 0:
-                    print(f"  ⚠️  No wallet activity found, skipping")
+                    logger.debug("  ⚠️  No wallet activity found, skipping")
                     continue
                 
                 # Calculate base suspicion score (now NO-aware)
                 analysis = calculate_score(trade, wallet_data, market)
                 
                 # Add Latency Score
-                latency_score = 0
                 if latency_data:
-                    latency_score = calculate_latency_score(latency_data['latency_seconds'])
                     analysis['score'] += latency_score
-                    analysis['flags'].append(f"Pre-event latency: {latency_data['latency_minutes']:.0f}m")
+                    analysis['flags'].append(f"Pre-event latency: {latency_data.latency_minutes:.0f}m")
                 
                 # Add Wallet History Score
-                history_score = 0
-                if wallet_stats and wallet_stats['total_trades'] >= 3:
-                    if wallet_stats['insider_score'] >= 70:
-                        history_score = 20
-                        analysis['flags'].append(f"Known insider (score: {wallet_stats['insider_score']:.0f})")
-                    elif wallet_stats['insider_score'] >= 50:
-                        history_score = 10
-                        analysis['flags'].append(f"Suspicious history (score: {wallet_stats['insider_score']:.0f})")
+                if history_flag:
+                    analysis['flags'].append(history_flag)
                 
                 analysis['score'] += history_score
                 
-                print(f"  📊 Score: {analysis['score']}/150 (base: {analysis['score'] - latency_score - history_score}, latency: +{latency_score}, history: +{history_score})")
-                print(f"     Flags: {', '.join(analysis['flags']) if analysis['flags'] else 'None'}")
-                print(f"     Wallet age: {analysis['wallet_age_days']} days")
-                print(f"     Activities: {analysis['total_activities']}")
-                print(f"     Effective odds: {analysis['odds']*100:.1f}%")
-                if is_no:
-                    print(f"     ⚠️  NO position — real bet: ${amount:,.0f}, potential profit: ${analysis.get('potential_pnl', 0):,.0f} ({analysis.get('pnl_multiplier', 0):.1f}x)")
+                if debug:
+                    logger.debug("  📊 Score: %s/150 (base: %s, latency: +%s, history: +%s)",
+                                 analysis['score'], analysis['score'] - latency_score - history_score, latency_score, history_score)
+                    logger.debug("     Flags: %s", ', '.join(analysis['flags']) if analysis['flags'] else 'None')
+                    logger.debug("     Wallet age: %s days", analysis['wallet_age_days'])
+                    logger.debug("     Activities: %s", analysis['total_activities'])
+                    logger.debug("     Effective odds: %.1f%%", analysis['odds'] * 100)
+                    if is_no:
+                        logger.debug("     ⚠️  NO position — real bet: $%s, potential profit: $%s (%.1fx)",
+                                     format(amount, ",.0f"), format(analysis.get('potential_pnl', 0), ",.0f"), analysis.get('pnl_multiplier', 0))
                 
                 # Check if alert threshold met
                 if analysis["score"] >= ALERT_THRESHOLD:
                     # Apply filters before alerting
-                    latency_min = latency_data['latency_minutes'] if latency_data else None
+                    latency_min = latency_data.latency_minutes if latency_data else None
                     
                     # FIX: Pass outcome to should_skip_alert for correct NO filtering
                     should_skip, skip_reason = should_skip_alert(
@@ -240,26 +367,27 @@ def detect_insider_trades():
                     
                     if should_skip:
                         filtered_by_rules += 1
-                        print(f"  🚫 FILTERED: {skip_reason}")
-                        print(f"     (Score was {analysis['score']} >= {ALERT_THRESHOLD}, but filtered out)")
+                        logger.info("  🚫 FILTERED: %s", skip_reason)
+                        logger.info("     (Score was %s >= %s, but filtered out)", analysis['score'], ALERT_THRESHOLD)
                     else:
                         # Check for coordinated attack
-                        from database_fixed import get_recent_alerts_for_market
-                        recent_alerts = get_recent_alerts_for_market(market.get("question", ""), hours=6)
+                        question = market.get("question", "")
+                        if question not in recent_alerts_cache:
+                            recent_alerts_cache[question] = get_recent_alerts_for_market(question, hours=6)
+                        recent_alerts = recent_alerts_cache[question]
+                        recent_count = len(recent_alerts) + pending_by_market.get(question, 0)
                         
-                        if len(recent_alerts) >= 3:
+                        if recent_count >= 3:
                             filtered_coordinated += 1
-                            print(f"  🚫 FILTERED: COORDINATED_ATTACK")
-                            print(f"     Market: {market.get('question', '')[:60]}")
-                            print(f"     Similar alerts in last 6h: {len(recent_alerts)}")
-                            print(f"     Possible pump & dump or sybil attack")
+                            logger.info("  🚫 FILTERED: COORDINATED_ATTACK")
+                            logger.info("     Market: %s", market.get('question', '')[:60])
+                            logger.info("     Similar alerts in last 6h: %d", recent_count)
+                            logger.info("     Possible pump & dump or sybil attack")
                             continue
                         
                         # ══════════════════════════════════════════
                         # IRRATIONALITY ANALYSIS (Methodology v2)
                         # ══════════════════════════════════════════
-                        from irrationality import analyze_market_irrationality
-                        
                         irrationality_analysis = analyze_market_irrationality(
                             market_question=market.get("question", ""),
                             yes_price=price,  # raw YES price
@@ -269,9 +397,10 @@ def detect_insider_trades():
                         )
                         
                         combined_signal = irrationality_analysis['combined_signal']
-                        print(f"  📊 Combined Signal: {combined_signal['signal_type']} (strength: {combined_signal['signal_strength']})")
-                        print(f"     Irrationality: {irrationality_analysis['irrationality']['irrationality_score']}/100")
-                        print(f"     Mispricing: edge {irrationality_analysis['mispricing']['edge_percent']:+.1f}% ({irrationality_analysis['mispricing']['edge_quality']})")
+                        logger.info("  📊 Combined Signal: %s (strength: %s)", combined_signal['signal_type'], combined_signal['signal_strength'])
+                        logger.info("     Irrationality: %s/100", irrationality_analysis['irrationality']['irrationality_score'])
+                        logger.info("     Mispricing: edge %+.1f%% (%s)",
+                                    irrationality_analysis['mispricing']['edge_percent'], irrationality_analysis['mispricing']['edge_quality'])
 
                         # Additional signal-quality gating (post-score, post-rules)
                         signal_type = combined_signal.get('signal_type', 'INSIDER_ONLY')
@@ -279,17 +408,17 @@ def detect_insider_trades():
 
                         if signal_strength < COMBINED_SIGNAL_MIN_STRENGTH:
                             filtered_weak_signal += 1
-                            print(f"  🚫 FILTERED: WEAK_COMBINED_SIGNAL (strength {signal_strength} < {COMBINED_SIGNAL_MIN_STRENGTH})")
+                            logger.info("  🚫 FILTERED: WEAK_COMBINED_SIGNAL (strength %s < %s)", signal_strength, COMBINED_SIGNAL_MIN_STRENGTH)
                             continue
 
                         if signal_type == "CONFLICT" and analysis['score'] < CONFLICT_MIN_INSIDER_SCORE:
                             filtered_weak_signal += 1
-                            print(f"  🚫 FILTERED: CONFLICT_LOW_CONFIDENCE (insider score {analysis['score']} < {CONFLICT_MIN_INSIDER_SCORE})")
+                            logger.info("  🚫 FILTERED: CONFLICT_LOW_CONFIDENCE (insider score %s < %s)", analysis['score'], CONFLICT_MIN_INSIDER_SCORE)
                             continue
 
                         if signal_type == "INSIDER_ONLY" and INSIDER_ONLY_REQUIRES_PRE_EVENT and latency_data is None:
                             filtered_weak_signal += 1
-                            print("  🚫 FILTERED: INSIDER_ONLY_WITHOUT_PRE_EVENT")
+                            logger.info("  🚫 FILTERED: INSIDER_ONLY_WITHOUT_PRE_EVENT")
                             continue
                         
                         # Create enhanced alert with correct NO data
@@ -298,11 +427,11 @@ def detect_insider_trades():
                             "market_slug": market.get("slug"),
                             "wallet": wallet_address,
                             "analysis": analysis,
-                            "timestamp": datetime.now().isoformat(),
+                            "timestamp": now.isoformat(),
                             "trade_hash": trade_hash,
                             "trade_timestamp": trade.get("timestamp"),
                             # Latency data
-                            "latency": latency_data,
+                            "latency": latency_data.as_dict() if latency_data else None,
                             # Wallet stats
                             "wallet_stats": wallet_stats,
                             # ══════════════════════════════════════════
@@ -328,83 +457,77 @@ def detect_insider_trades():
                             "combined_signal": combined_signal
                         }
                         alerts.append(alert)
-                        print(f"  🚨 ALERT! Score {analysis['score']} >= {ALERT_THRESHOLD}")
+                        logger.info("  🚨 ALERT! Score %s >= %s", analysis['score'], ALERT_THRESHOLD)
                         
-                        # Mark alert as sent
-                        mark_alert_sent(
+                        # Mark alert as sent (flushed in one batch after the loop)
+                        pending_mark.append((
                             wallet_address, 
                             market.get("question"), 
                             trade_hash,
                             wallet_stats['insider_score'] if wallet_stats else 0,
-                            latency_data['latency_seconds'] if latency_data else None
-                        )
+                            latency_data.latency_seconds if latency_data else None
+                        ))
+                        sent_alerts.add((wallet_address, trade_hash))
+                        pending_by_market[question] = pending_by_market.get(question, 0) + 1
                 else:
-                    print(f"  ✓ Below threshold ({analysis['score']} < {ALERT_THRESHOLD})")
-                
-                # Save Trade to History
-                trade_record = {
-                    'wallet': wallet_address,
-                    'market': market.get('question'),
-                    'trade_timestamp': datetime.fromtimestamp(trade.get('timestamp'), tz=timezone.utc),
-                    'event_timestamp': datetime.fromisoformat(latency_data['event_time']) if latency_data else None,
-                    'latency_seconds': latency_data['latency_seconds'] if latency_data else None,
-                    'position': outcome,  # FIX: use actual outcome, not trade.get('outcome', 'Unknown')
-                    'size': amount,       # FIX: correct amount for NO positions
-                    'odds': effective_odds,  # FIX: effective odds
-                    'is_pre_event': latency_data is not None,
-                    'trade_hash': trade_hash
-                }
-                save_trade(trade_record)
+                    logger.debug("  ✓ Below threshold (%s < %s)", analysis['score'], ALERT_THRESHOLD)
                 
-                # Update Wallet Stats
-                update_wallet_stats(wallet_address, {
-                    'size': amount,  # FIX: correct amount
-                    'is_pre_event': latency_data is not None,
-                    'latency_seconds': latency_data['latency_seconds'] if latency_data else None
-                })
+                # Save Trade to History and Update Wallet Stats
+                trade_record, wallet_update = build_trade_writes(
+                    trade, wallet_address, market, outcome, amount, effective_odds, trade_hash, latency_data
+                )
+                trade_records.append(trade_record)
+                wallet_updates.append(wallet_update)
                 
                 processed_count += 1
                 
             except Exception as e:
                 error_count += 1
-                print(f"  ❌ Error processing trade #{idx + 1}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("  ❌ Error processing trade #%d: %s: %s", idx + 1, type(e).__name__, e)
+                logger.debug("  Traceback for trade #%d:", idx + 1, exc_info=True)
                 if error_count > 10:
-                    print(f"[{datetime.now()}] ⚠️  Too many errors ({error_count}), stopping analysis")
+                    logger.warning("[%s] ⚠️  Too many errors (%d), stopping analysis", now, error_count)
                     break
                 continue
         
+        # Flush batched writes (one transaction per table)
+        saved_count = save_trades_bulk(trade_records)
+        update_wallet_stats_bulk(wallet_updates)
+        mark_alerts_sent_bulk(pending_mark)
+        logger.info("[%s] Saved %d new trades, updated %d wallets", datetime.now(), saved_count, len({w for w, _ in wallet_updates}))
+        
         # Final summary
         execution_time = (datetime.now() - execution_start).total_seconds()
         
-        print(f"\n[{datetime.now()}] ════════════════════════════════")
-        print(f"[{datetime.now()}] DETECTION SUMMARY:")
-        print(f"[{datetime.now()}] ════════════════════════════════")
-        print(f"[{datetime.now()}] Total trades analyzed: {len(trades)}")
-        print(f"[{datetime.now()}] Processed (≥${MIN_BET_SIZE:,}): {processed_count}")
-        print(f"[{datetime.now()}] ")
-        print(f"[{datetime.now()}] Filtered out:")
-        print(f"[{datetime.now()}]   - Small bets (<${MIN_BET_SIZE:,}): {filtered_small}")
-        print(f"[{datetime.now()}]   - Invalid data: {filtered_invalid_data}")
-        print(f"[{datetime.now()}]   - No wallet address: {filtered_no_wallet}")
-        print(f"[{datetime.now()}]   - No condition ID: {filtered_no_condition}")
-        print(f"[{datetime.now()}]   - Market not found: {filtered_no_market}")
-        print(f"[{datetime.now()}]   - Duplicate alerts: {filtered_duplicate}")
-        print(f"[{datetime.now()}]   - Arbitrage/Short-term/Absurd: {filtered_by_rules}")
-        print(f"[{datetime.now()}]   - Coordinated attacks: {filtered_coordinated}")
-        print(f"[{datetime.now()}]   - Weak combined signals: {filtered_weak_signal}")
-        print(f"[{datetime.now()}] ")
-        print(f"[{datetime.now()}] 🔍 Pre-event trades detected: {pre_event_detected}")
-        print(f"[{datetime.now()}] Errors encountered: {error_count}")
-        print(f"[{datetime.now()}] Alerts generated: {len(alerts)}")
-        print(f"[{datetime.now()}] Execution time: {execution_time:.1f}s")
-        print(f"[{datetime.now()}] ════════════════════════════════")
+        now = datetime.now()
+        summary_lines = [
+            "════════════════════════════════",
+            "DETECTION SUMMARY:",
+            "════════════════════════════════",
+            f"Total trades analyzed: {len(trades)}",
+            f"Processed (≥${MIN_BET_SIZE:,}): {processed_count}",
+            "",
+            "Filtered out:",
+            f"  - Small bets (<${MIN_BET_SIZE:,}): {filtered_small}",
+            f"  - Invalid data: {filtered_invalid_data}",
+            f"  - No wallet address: {filtered_no_wallet}",
+            f"  - No condition ID: {filtered_no_condition}",
+            f"  - Market not found: {filtered_no_market}",
+            f"  - Duplicate alerts: {filtered_duplicate}",
+            f"  - Arbitrage/Short-term/Absurd: {filtered_by_rules}",
+            f"  - Coordinated attacks: {filtered_coordinated}",
+            f"  - Weak combined signals: {filtered_weak_signal}",
+            "",
+            f"🔍 Pre-event trades detected: {pre_event_detected}",
+            f"Errors encountered: {error_count}",
+            f"Alerts generated: {len(alerts)}",
+            f"Execution time: {execution_time:.1f}s",
+            "════════════════════════════════",
+        ]
+        logger.info("\n" + "\n".join(f"[{now}] {line}" for line in summary_lines))
         
         return alerts
         
     except Exception as e:
-        print(f"[{datetime.now()}] ❌ FATAL ERROR in detect_insider_trades: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[%s] ❌ FATAL ERROR in detect_insider_trades: %s", datetime.now(), e)
         return []
@@ -1,12 +1,98 @@
+from bisect import bisect_right
+from calendar import isleap, timegm
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional, Tuple
+from typing import Dict, NamedTuple, Optional, Tuple
 import re
+import time
 from functools import lru_cache
 
 # FIX BUG #1 & #7: Copy extract_event_date_from_title to avoid circular import
 # Previously imported from analyzer, causing circular dependency
+# (analyzer now imports it from here; this module imports nothing from analyzer)
+
+# Date patterns, compiled once at import. Every pattern needs a digit, so
+# titles without one (most of them) are rejected by _DIGIT_RE alone.
+_DIGIT_RE = re.compile(r'\d')
+_ISO_DATE_RE = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})')
+_REVERSE_DATE_RE = re.compile(r'(\d{1,2})[-/\.](\d{1,2})[-/\.](\d{4})')
+
+_MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sep': 9, 'sept': 9,
+    'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
+}
+# Longest names first so "september"/"sept" win over "sep"
+_MONTH_ALT = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+# "January 19" / "Jan 19", then "19 January" / "19 Jan" (month-first wins, as
+# it always has). Month names are whole words and a day never starts
+# mid-number, so a price ("$88,000 January 12", "$120 January 12") can't
+# swallow the real date
+_MONTH_DAY_RE = re.compile(rf'\b({_MONTH_ALT})\b\s+(?<!\d)(\d{{1,2}})', re.IGNORECASE)
+_DAY_MONTH_RE = re.compile(rf'(?<!\d)(\d{{1,2}})\s+\b({_MONTH_ALT})\b', re.IGNORECASE)
+
+# Latency bands (seconds before event): <2m, 2-5m, 5-10m, 10-20m, 20-30m, 30m+.
+# bisect_right(_LATENCY_BANDS, latency_seconds) indexes both tables below.
+_LATENCY_BANDS = (120, 300, 600, 1200, 1800)
+_LATENCY_SCORES = (0, 10, 20, 30, 35, 40)
+_LATENCY_SEVERITY = ('LOW', 'LOW', 'MEDIUM', 'HIGH', 'HIGH', 'CRITICAL')
+
+# Market endDate in the shape the Gamma API returns ("2026-01-19T12:00:00Z",
+# optionally with .fff/.ffffff); anything else goes through fromisoformat
+_END_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{3}|\d{6}))?Z')
+
+# Phrases marking a real-time market. Whole words (a deliberate change from
+# the old `kw in text.lower()` substring checks), so "Liverpool" or "deliver"
+# don't count as "live"; IGNORECASE so the question never has to be lowercased
+_REALTIME_RE = re.compile(r'\b(?:right now|currently|at the moment|live|real[- ]time|as of now|instant)\b', re.IGNORECASE)
+
+# Longest day each month can have (Feb 29 allowed; leap years are checked
+# separately once the year is known)
+_MAX_MONTH_DAYS = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _is_valid_date(year: int, month: int, day: int) -> bool:
+    """Range check instead of try: datetime(...) - parse misses are common."""
+    return (
+        1 <= year and 1 <= month <= 12 and 1 <= day <= _MAX_MONTH_DAYS[month - 1]
+        and (month != 2 or day != 29 or isleap(year))
+    )
+
+@lru_cache(maxsize=4096)
+def _extract_date_parts(title: str) -> Optional[Tuple[Optional[int], int, int]]:
+    """
+    Pure part of extract_event_date_from_title: returns (year, month, day),
+    with year None when the title names only month and day.
+    Cached, since it doesn't depend on the current date.
+    """
+    if not title or not _DIGIT_RE.search(title):
+        return None
+    
+    # Pattern 1: ISO date (2026-01-19, 2026/01/19)
+    iso_match = _ISO_DATE_RE.search(title)
+    if iso_match:
+        year, month, day = int(iso_match.group(1)), int(iso_match.group(2)), int(iso_match.group(3))
+        if _is_valid_date(year, month, day):
+            return year, month, day
+    
+    # Pattern 2: Reverse date (19-01-2026, 19/01/2026, 19.01.2026)
+    reverse_match = _REVERSE_DATE_RE.search(title)
+    if reverse_match:
+        day, month, year = int(reverse_match.group(1)), int(reverse_match.group(2)), int(reverse_match.group(3))
+        if _is_valid_date(year, month, day):
+            return year, month, day
+    
+    # Pattern 3: Month name (January 19, Jan 19), then (19 January); first valid match wins
+    for match in _MONTH_DAY_RE.finditer(title):
+        month_num, day = _MONTHS[match.group(1).lower()], int(match.group(2))
+        if 1 <= day <= _MAX_MONTH_DAYS[month_num - 1]:
+            return None, month_num, day
+    for match in _DAY_MONTH_RE.finditer(title):
+        month_num, day = _MONTHS[match.group(2).lower()], int(match.group(1))
+        if 1 <= day <= _MAX_MONTH_DAYS[month_num - 1]:
+            return None, month_num, day
+    
+    return None
 
-@lru_cache(maxsize=100)
 def extract_event_date_from_title(title: str) -> Optional[datetime]:
     """
     Extract event date from market title.
@@ -15,164 +101,185 @@ def extract_event_date_from_title(title: str) -> Optional[datetime]:
     
     FIX BUG #7: Copied from analyzer.py to avoid circular import.
     """
-    if not title:
+    parts = _extract_date_parts(title)
+    if parts is None:
         return None
     
-    title_lower = title.lower()
+    year, month, day = parts
+    if year is None:
+        # If month already passed this year, use next year
+        now = datetime.now(timezone.utc)
+        year = now.year + 1 if month < now.month else now.year
     
-    # Pattern 1: ISO date (2026-01-19, 2026/01/19)
-    iso_match = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', title)
-    if iso_match:
-        try:
-            year, month, day = int(iso_match.group(1)), int(iso_match.group(2)), int(iso_match.group(3))
-            return datetime(year, month, day, tzinfo=timezone.utc)
-        except:
-            pass
+    if not _is_valid_date(year, month, day):
+        return None  # Feb 29 outside a leap year
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+@lru_cache(maxsize=2048)
+def _parse_end_date(market_end_date: str) -> Optional[datetime]:
+    """
+    Parse a market endDate string (cached; many trades share a market).
+    Returns None if it can't be parsed. Naive timestamps are taken as UTC.
+    """
+    if not isinstance(market_end_date, str):
+        return None
+    match = _END_DATE_RE.fullmatch(market_end_date)
+    if match:
+        fraction = match.group(7)
+        year, month, day, hour, minute, second = map(int, match.groups()[:6])
+        if not (_is_valid_date(year, month, day) and hour < 24 and minute < 60 and second < 60):
+            return None
+        return datetime(
+            year, month, day, hour, minute, second,
+            int(fraction.ljust(6, '0')) if fraction else 0,
+            tzinfo=timezone.utc
+        )
+    
+    # Unusual shapes only; fromisoformat raises ValueError on anything invalid
+    try:
+        event_time = datetime.fromisoformat(market_end_date.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if event_time.tzinfo is None:
+        event_time = event_time.replace(tzinfo=timezone.utc)
+    return event_time
+
+def _end_date_epoch(market_end_date: str) -> Optional[float]:
+    """Epoch seconds of a market endDate string, or None."""
+    if not isinstance(market_end_date, str):
+        return None  # checked before the cache: lists/dicts are unhashable
+    event_time = _parse_end_date(market_end_date)
+    return event_time.timestamp() if event_time else None
+
+def _title_date_epoch(title: str) -> Optional[int]:
+    """Epoch seconds (UTC midnight) of the date named in a title, or None."""
+    parts = _extract_date_parts(title)
+    if parts is None:
+        return None
     
-    # Pattern 2: Reverse date (19-01-2026, 19/01/2026, 19.01.2026)
-    reverse_match = re.search(r'(\d{1,2})[-/\.](\d{1,2})[-/\.](\d{4})', title)
-    if reverse_match:
-        try:
-            day, month, year = int(reverse_match.group(1)), int(reverse_match.group(2)), int(reverse_match.group(3))
-            return datetime(year, month, day, tzinfo=timezone.utc)
-        except:
-            pass
-    
-    # Pattern 3: Month name (January 19, Jan 19, 19 January)
-    months = {
-        'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
-        'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
-        'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sep': 9, 'sept': 9,
-        'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
-    }
-    
-    for month_name, month_num in months.items():
-        # "January 19" or "Jan 19"
-        pattern1 = rf'{month_name}\s+(\d{{1,2}})'
-        match1 = re.search(pattern1, title_lower)
-        if match1:
-            day = int(match1.group(1))
-            year = datetime.now().year
-            
-            # If month already passed this year, use next year
-            current_month = datetime.now().month
-            if month_num < current_month:
-                year += 1
-            
-            try:
-                return datetime(year, month_num, day, tzinfo=timezone.utc)
-            except:
-                pass
-        
-        # "19 January" or "19 Jan"
-        pattern2 = rf'(\d{{1,2}})\s+{month_name}'
-        match2 = re.search(pattern2, title_lower)
-        if match2:
-            day = int(match2.group(1))
-            year = datetime.now().year
-            
-            # If month already passed this year, use next year
-            current_month = datetime.now().month
-            if month_num < current_month:
-                year += 1
-            
-            try:
-                return datetime(year, month_num, day, tzinfo=timezone.utc)
-            except:
-                pass
+    year, month, day = parts
+    if year is None:
+        # If month already passed this year, use next year
+        now = time.gmtime()
+        year = now.tm_year + 1 if month < now.tm_mon else now.tm_year
     
-    return None
+    if not _is_valid_date(year, month, day):
+        return None  # Feb 29 outside a leap year
+    return timegm((year, month, day, 0, 0, 0))
 
-def extract_event_timestamp(market_question: str, market_end_date: str = None) -> Optional[datetime]:
+@lru_cache(maxsize=2048)
+def _dated_event_epoch(market_question: str, market_end_date: Optional[str]) -> Optional[float]:
     """
-    Extract event timestamp from market question or end date.
+    Event epoch from the end date or a date in the question (cached per market;
+    the process lives for one scan, so the title's year rollover can't go stale).
+    """
+    # Method 1: Use market end date if available
+    if market_end_date:
+        event_epoch = _end_date_epoch(market_end_date)
+        if event_epoch is not None:
+            return event_epoch
+    
+    # Method 2: Extract date from question
+    return _title_date_epoch(market_question)
+
+def extract_event_epoch(market_question: str, market_end_date: str = None) -> Optional[float]:
+    """
+    Extract event time as UTC epoch seconds from market question or end date.
     
     For Phase 1: Use market end date as proxy for event time.
     Phase 2: Integrate news API for actual event timestamps.
     
-    Returns timezone-aware datetime in UTC.
+    Real-time ("right now") markets have no event time: detect_pre_event_trade
+    skips them via is_realtime_market before getting here, so the old "event is
+    now" fallback was removed.
     """
-    # Method 1: Use market end date if available
-    if market_end_date:
-        try:
-            event_time = datetime.fromisoformat(market_end_date.replace("Z", "+00:00"))
-            return event_time
-        except:
-            pass
-    
-    # Method 2: Extract date from question using copied function
-    event_date = extract_event_date_from_title(market_question)
-    if event_date:
-        return event_date
-    
-    # Method 3: Real-time markets (event is "now")
-    # E.g., "Bitcoin above $105k right now"
-    realtime_keywords = ['right now', 'currently', 'at the moment', 'as of now']
-    if any(kw in market_question.lower() for kw in realtime_keywords):
-        return datetime.now(timezone.utc)
-    
-    return None
+    return _dated_event_epoch(market_question, market_end_date)
 
-def calculate_event_latency(trade_timestamp: int, event_timestamp: datetime) -> Optional[Dict]:
+def extract_event_timestamp(market_question: str, market_end_date: str = None) -> Optional[datetime]:
     """
-    Calculate latency between trade and event.
-    FIX BUG #8: Ensure timezone-aware datetime handling.
+    Extract event timestamp from market question or end date.
     
-    Returns:
-        {
-            'latency_seconds': float,
-            'latency_minutes': float,
-            'is_pre_event': bool,
-            'severity': str  # 'CRITICAL', 'HIGH', 'MEDIUM', 'LOW'
-        }
+    Returns timezone-aware datetime in UTC.
     """
-    if not event_timestamp:
+    event_epoch = extract_event_epoch(market_question, market_end_date)
+    if event_epoch is None:
         return None
+    return datetime.fromtimestamp(event_epoch, tz=timezone.utc)
+
+class LatencyResult(NamedTuple):
+    """
+    Latency between a trade and its event.
+
+    Times are kept as epoch seconds; ISO strings are only built when read
+    (trade_time / event_time) or when serialised with as_dict() for alerts.
+    """
+    latency_seconds: float
+    latency_minutes: float
+    is_pre_event: bool
+    severity: str  # 'CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'NONE'
+    trade_timestamp: float
+    event_timestamp: float
+
+    @property
+    def trade_time(self) -> str:
+        return datetime.fromtimestamp(self.trade_timestamp, tz=timezone.utc).isoformat()
+
+    @property
+    def event_time(self) -> str:
+        return datetime.fromtimestamp(self.event_timestamp, tz=timezone.utc).isoformat()
+
+    def as_dict(self) -> Dict:
+        """JSON-friendly dict (the format alerts and notifier expect)"""
+        return {
+            'latency_seconds': self.latency_seconds,
+            'latency_minutes': self.latency_minutes,
+            'is_pre_event': self.is_pre_event,
+            'severity': self.severity,
+            'trade_time': self.trade_time,
+            'event_time': self.event_time
+        }
+
+def calculate_event_latency(trade_timestamp: int, event_timestamp: float) -> Optional[LatencyResult]:
+    """
+    Calculate latency between trade and event (both UTC epoch seconds).
     
-    # FIX BUG #8: Convert trade timestamp to timezone-aware datetime
-    trade_time = datetime.fromtimestamp(trade_timestamp, tz=timezone.utc)
+    Returns LatencyResult or None if there is no event timestamp.
+    """
+    if event_timestamp is None:
+        return None
     
     # Calculate latency (positive = before event, negative = after event)
-    latency_seconds = (event_timestamp - trade_time).total_seconds()
+    latency_seconds = event_timestamp - trade_timestamp
     latency_minutes = latency_seconds / 60
     
     # Determine if pre-event
     is_pre_event = latency_seconds > 0
     
-    # Classify severity
+    # Classify severity: 30+ min CRITICAL, 10+ HIGH, 5+ MEDIUM, else LOW
     if not is_pre_event:
         severity = 'NONE'  # After event
-    elif latency_seconds >= 1800:  # 30+ minutes
-        severity = 'CRITICAL'
-    elif latency_seconds >= 600:   # 10+ minutes
-        severity = 'HIGH'
-    elif latency_seconds >= 300:   # 5+ minutes
-        severity = 'MEDIUM'
     else:
-        severity = 'LOW'
+        severity = _LATENCY_SEVERITY[bisect_right(_LATENCY_BANDS, latency_seconds)]
     
-    return {
-        'latency_seconds': latency_seconds,
-        'latency_minutes': latency_minutes,
-        'is_pre_event': is_pre_event,
-        'severity': severity,
-        'trade_time': trade_time.isoformat(),
-        'event_time': event_timestamp.isoformat()
-    }
+    return LatencyResult(latency_seconds, latency_minutes, is_pre_event, severity,
+                         trade_timestamp, event_timestamp)
 
-def detect_pre_event_trade(trade: Dict, market: Dict) -> Optional[Dict]:
+def detect_pre_event_trade(trade: Dict, market: Dict) -> Optional[LatencyResult]:
     """
     Main function to detect if trade is before event.
     
     Returns latency analysis or None if not pre-event.
     """
+    question = market.get('question', '')
+    
+    # Real-time markets have no pre-event window - skip before any date parsing
+    if should_skip_realtime_market(question):
+        return None
+    
     # Extract event timestamp
-    event_timestamp = extract_event_timestamp(
-        market.get('question', ''),
-        market.get('endDate')
-    )
+    event_timestamp = extract_event_epoch(question, market.get('endDate'))
     
-    if not event_timestamp:
+    if event_timestamp is None:
         return None
     
     # Calculate latency
@@ -183,29 +290,28 @@ def detect_pre_event_trade(trade: Dict, market: Dict) -> Optional[Dict]:
     latency = calculate_event_latency(trade_timestamp, event_timestamp)
     
     # Only return if pre-event with significant latency
-    if latency and latency['is_pre_event'] and latency['severity'] != 'NONE':
+    if latency and latency.is_pre_event and latency.severity != 'NONE':
         return latency
     
     return None
 
-def get_latency_insight(latency_data: Dict) -> str:
+# Insight line per severity; anything else (LOW) uses the plain template
+_INSIGHT_TEMPLATES = {
+    'CRITICAL': "⚠️ EXTREME PRE-EVENT: Trade placed {:.0f} minutes BEFORE event",
+    'HIGH': "🚨 HIGH PRE-EVENT: Trade placed {:.0f} minutes before event",
+    'MEDIUM': "⚡ MEDIUM PRE-EVENT: Trade placed {:.0f} minutes before event",
+}
+_DEFAULT_INSIGHT_TEMPLATE = "⏰ Trade placed {:.0f} minutes before event"
+
+def get_latency_insight(latency_data: Optional[LatencyResult]) -> str:
     """
     Generate human-readable insight about latency advantage.
     """
-    if not latency_data or not latency_data.get('is_pre_event'):
+    if not latency_data or not latency_data.is_pre_event:
         return ""
     
-    minutes = abs(latency_data['latency_minutes'])
-    severity = latency_data['severity']
-    
-    if severity == 'CRITICAL':
-        return f"⚠️ EXTREME PRE-EVENT: Trade placed {minutes:.0f} minutes BEFORE event"
-    elif severity == 'HIGH':
-        return f"🚨 HIGH PRE-EVENT: Trade placed {minutes:.0f} minutes before event"
-    elif severity == 'MEDIUM':
-        return f"⚡ MEDIUM PRE-EVENT: Trade placed {minutes:.0f} minutes before event"
-    else:
-        return f"⏰ Trade placed {minutes:.0f} minutes before event"
+    template = _INSIGHT_TEMPLATES.get(latency_data.severity, _DEFAULT_INSIGHT_TEMPLATE)
+    return template.format(abs(latency_data.latency_minutes))
 
 def calculate_latency_score(latency_seconds: float) -> int:
     """
@@ -222,20 +328,7 @@ def calculate_latency_score(latency_seconds: float) -> int:
     if latency_seconds < 0:  # After event
         return 0
     
-    minutes = latency_seconds / 60
-    
-    if minutes >= 30:
-        return 40
-    elif minutes >= 20:
-        return 35
-    elif minutes >= 10:
-        return 30
-    elif minutes >= 5:
-        return 20
-    elif minutes >= 2:
-        return 10
-    else:
-        return 0
+    return _LATENCY_SCORES[bisect_right(_LATENCY_BANDS, latency_seconds)]
 
 def is_realtime_market(market_question: str) -> bool:
     """
@@ -246,19 +339,10 @@ def is_realtime_market(market_question: str) -> bool:
     - "Current weather in NYC"
     - "Live game score"
     """
-    realtime_keywords = [
-        'right now', 'currently', 'at the moment', 'live',
-        'real-time', 'real time', 'as of now', 'instant'
-    ]
-    
-    question_lower = market_question.lower()
-    return any(kw in question_lower for kw in realtime_keywords)
+    return _REALTIME_RE.search(market_question) is not None
 
-def should_skip_realtime_market(market_question: str) -> bool:
-    """
-    Filter out real-time markets where pre-event concept doesn't apply.
-    """
-    return is_realtime_market(market_question)
+# Filter out real-time markets where pre-event concept doesn't apply
+should_skip_realtime_market = is_realtime_market
 
 # NEWS API INTEGRATION (Phase 2 - placeholder for now)
 def get_news_timestamp(market_question: str, event_keywords: list = None) -> Optional[datetime]:
@@ -11,14 +11,28 @@ Two-step model:
 
 import re
 import json
+import hashlib
 import logging
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timezone
-from openai import OpenAI
-from config import OPENAI_API_KEY
+from config import OPENAI_API_KEY, LLM_CACHE_TTL
+from database_fixed import get_llm_cache, set_llm_cache
 
 logger = logging.getLogger(__name__)
 
+# Shared OpenAI client (created on first use so importing without a key works);
+# reusing it keeps the HTTPS connection alive between calls. The SDK itself is
+# imported here too: it pulls in httpx/pydantic, and most runs never call it.
+_openai_client = None
+
+def _get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=3, timeout=30.0)
+    return _openai_client
+
 # ══════════════════════════════════════════════════════════════════
 # CATEGORY CLASSIFICATION
 # ══════════════════════════════════════════════════════════════════
@@ -61,6 +75,26 @@ CATEGORY_KEYWORDS = {
     ]
 }
 
+# Characters that make a keyword a real regex rather than a plain substring
+_REGEX_CHARS = frozenset('.^$*+?{}[]()|\\')
+
+def _compile_category(keywords: list) -> Tuple[tuple, Optional[re.Pattern], tuple]:
+    """
+    Split keywords into plain substrings (matched with `in`) and regexes.
+    Regexes get a combined alternation to rule the category out in one pass,
+    plus their own patterns to count distinct matches.
+    """
+    literals = tuple(kw for kw in keywords if not _REGEX_CHARS & set(kw))
+    regexes = [kw for kw in keywords if _REGEX_CHARS & set(kw)]
+    combined = re.compile('|'.join(f'(?:{kw})' for kw in regexes)) if regexes else None
+    return literals, combined, tuple(re.compile(kw) for kw in regexes)
+
+# Compiled once at import; patterns run against the lowercased question
+_CATEGORY_MATCHERS = {
+    category: _compile_category(keywords)
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
 # Bias strength by category (how much longshots are typically overpriced)
 # v2: Geopolitics and Macro upgraded — war/crisis markets are VERY emotional
 CATEGORY_BIAS = {
@@ -75,6 +109,35 @@ CATEGORY_BIAS = {
     'other': {'strength': 'medium', 'typical_overpricing': 0.03, 'min_edge': 0.05}
 }
 
+# Longshot price threshold by category (default 0.15): fear-driven war/crisis
+# markets still count 30% as a longshot, meme markets 25%
+LONGSHOT_THRESHOLDS = {
+    'geopolitics': 0.30,
+    'macro': 0.30,
+    'meme': 0.25,
+    'conspiracy': 0.25
+}
+
+# Points and flag wording for a longshot, by category bias strength
+LONGSHOT_SCORES = {
+    'very_high': (35, "Longshot ({pct:.0f}%) in very high bias category ({category})"),
+    'high': (25, "Longshot ({pct:.0f}%) in high bias category ({category})"),
+    'medium': (15, "Longshot ({pct:.0f}%) in medium bias category ({category})")
+}
+LONGSHOT_SCORE_DEFAULT = (5, "Longshot ({pct:.0f}%) — but category has low bias")
+
+# Points for a category being structurally prone to bias
+STRENGTH_POINTS = {
+    'very_high': 20,
+    'high': 15,
+    'medium': 10,
+    'low': 5
+}
+
+# Booster keywords (substring match, first hit in list order is reported)
+MEME_BOOSTERS = ('meme', 'viral', 'trending', 'hype', 'moon', 'crazy')
+CRISIS_BOOSTERS = ('war', 'strike', 'attack', 'invasion', 'nuclear', 'collapse', 'crash')
+
 # Base rates for probability estimation
 BASE_RATES = {
     "historically_near_zero": 0.01,  # Celebrity president, dead person alive
@@ -83,6 +146,13 @@ BASE_RATES = {
     "common": 0.35,                   # Genuine uncertainty — DON'T TRADE
 }
 
+# Confidence → (weight of own estimate, weight of market price); anything
+# else (high) keeps the estimate as is
+CONFIDENCE_BLEND = {
+    'low': (0.6, 0.4),     # Blend toward market
+    'medium': (0.8, 0.2)
+}
+
 # Category multipliers for probability adjustment
 CATEGORY_PROBABILITY_MULT = {
     'meme': 0.8,        # Memes rarely materialize
@@ -97,23 +167,23 @@ CATEGORY_PROBABILITY_MULT = {
 }
 
 
+@lru_cache(maxsize=4096)
 def classify_category(market_question: str) -> str:
     """
     Classify market into category based on keywords.
-    Returns the category with most matching keywords.
+    Returns the category with most matching keywords (cached per question).
     """
     if not market_question:
         return 'other'
     
     question_lower = market_question.lower()
     
-    # Count matches per category
+    # Count matching keywords per category
     category_scores = {}
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = 0
-        for keyword in keywords:
-            if re.search(keyword, question_lower):
-                score += 1
+    for category, (literals, combined, patterns) in _CATEGORY_MATCHERS.items():
+        score = sum(1 for literal in literals if literal in question_lower)
+        if combined is not None and combined.search(question_lower):
+            score += sum(1 for pattern in patterns if pattern.search(question_lower))
         if score > 0:
             category_scores[category] = score
     
@@ -134,7 +204,8 @@ def calculate_irrationality_score(
     volume_24h: float = 0,
     volume_avg_30d: float = 0,
     price_change_24h: float = 0,
-    edge_percent: float = 0  # NEW: edge from mispricing analysis
+    edge_percent: float = 0,  # NEW: edge from mispricing analysis
+    category: Optional[str] = None  # precomputed classify_category() result
 ) -> Dict:
     """
     Step 1 from Methodology v2: Is there evidence that market participants
@@ -148,30 +219,16 @@ def calculate_irrationality_score(
     score = 0
     flags = []
     
-    category = classify_category(market_question)
+    if category is None:
+        category = classify_category(market_question)
     category_info = CATEGORY_BIAS.get(category, CATEGORY_BIAS['other'])
     
     # 1. Longshot detection with CATEGORY-SPECIFIC thresholds
-    # Geopolitics/macro: expand threshold to 30% (fear-driven markets have higher "longshots")
-    longshot_threshold = 0.15  # default
-    if category in ['geopolitics', 'macro']:
-        longshot_threshold = 0.30  # war/crisis markets: 30% is still a "longshot"
-    elif category in ['meme', 'conspiracy']:
-        longshot_threshold = 0.25  # meme markets: 25% threshold
-    
-    if yes_price < longshot_threshold:
-        if category_info['strength'] == 'very_high':
-            score += 35
-            flags.append(f"Longshot ({yes_price*100:.0f}%) in very high bias category ({category})")
-        elif category_info['strength'] == 'high':
-            score += 25
-            flags.append(f"Longshot ({yes_price*100:.0f}%) in high bias category ({category})")
-        elif category_info['strength'] == 'medium':
-            score += 15
-            flags.append(f"Longshot ({yes_price*100:.0f}%) in medium bias category ({category})")
-        else:
-            score += 5
-            flags.append(f"Longshot ({yes_price*100:.0f}%) — but category has low bias")
+    strength = category_info['strength']
+    if yes_price < LONGSHOT_THRESHOLDS.get(category, 0.15):
+        points, flag = LONGSHOT_SCORES.get(strength, LONGSHOT_SCORE_DEFAULT)
+        score += points
+        flags.append(flag.format(pct=yes_price * 100, category=category))
     
     # 2. Volume spike without proportional news (hype/fear cycle)
     if volume_avg_30d > 0 and volume_24h > 0:
@@ -184,42 +241,33 @@ def calculate_irrationality_score(
             flags.append(f"Elevated volume {volume_ratio:.1f}x")
     
     # 3. Category is structurally prone to bias
-    category_bias_score = {
-        'very_high': 20,
-        'high': 15,
-        'medium': 10,
-        'low': 5
-    }
-    bias_points = category_bias_score.get(category_info['strength'], 5)
+    bias_points = STRENGTH_POINTS.get(strength, 5)
     score += bias_points
     if bias_points >= 15:
         flags.append(f"Category structurally prone to longshot bias")
     
     # 4. Extreme price movement (panic or euphoria)
-    if abs(price_change_24h) > 0.10:  # >10% move in 24h
+    price_move = price_change_24h if price_change_24h >= 0 else -price_change_24h
+    if price_move > 0.10:  # >10% move in 24h
         score += 15
         direction = "up" if price_change_24h > 0 else "down"
         flags.append(f"Extreme price move ({price_change_24h*100:+.0f}% {direction})")
-    elif abs(price_change_24h) > 0.05:
+    elif price_move > 0.05:
         score += 8
     
     # 5. Meme/conspiracy/crisis keywords boost
     question_lower = market_question.lower()
-    meme_boosters = ['meme', 'viral', 'trending', 'hype', 'moon', 'crazy']
-    crisis_boosters = ['war', 'strike', 'attack', 'invasion', 'nuclear', 'collapse', 'crash']
     
-    for booster in meme_boosters:
-        if booster in question_lower:
-            score += 5
-            flags.append(f"Meme language detected ('{booster}')")
-            break
+    meme_booster = next((kw for kw in MEME_BOOSTERS if kw in question_lower), None)
+    if meme_booster:
+        score += 5
+        flags.append(f"Meme language detected ('{meme_booster}')")
     
     # NEW: Crisis keywords get extra points (fear-driven pricing)
-    for booster in crisis_boosters:
-        if booster in question_lower:
-            score += 10
-            flags.append(f"Crisis keyword detected ('{booster}')")
-            break
+    crisis_booster = next((kw for kw in CRISIS_BOOSTERS if kw in question_lower), None)
+    if crisis_booster:
+        score += 10
+        flags.append(f"Crisis keyword detected ('{crisis_booster}')")
     
     # 6. NEW: Edge-based irrationality boost
     # If edge is large, the market IS irrational by definition
@@ -235,7 +283,8 @@ def calculate_irrationality_score(
             flags.append(f"Moderate mispricing edge (+{edge_percent:.1f}%)")
     
     # Cap at 100
-    score = min(score, 100)
+    if score > 100:
+        score = 100
     
     # Lower threshold for "irrational" classification
     return {
@@ -251,6 +300,15 @@ def calculate_irrationality_score(
 # CLAUDE FACTOR ANALYSIS
 # ══════════════════════════════════════════════════════════════════
 
+# Required top-level fields of the factor JSON and their expected types
+FACTOR_FIELD_TYPES = {
+    'base_rate_class': str,
+    'structural_feasibility': dict,
+    'category': str,
+    'confidence_in_analysis': str
+}
+
+
 def get_claude_factors(market_question: str, yes_price: float, end_date: str = None) -> Optional[Dict]:
     """
     Use Claude/GPT to decompose the question into scoreable factors.
@@ -260,9 +318,19 @@ def get_claude_factors(market_question: str, yes_price: float, end_date: str = N
     - Structural feasibility
     - Number of independent conditions required
     - Confidence in analysis
+    
+    Results are cached in the database for LLM_CACHE_TTL, keyed by question,
+    price (to the cent) and end date.
     """
+    cache_key = "factors:" + hashlib.sha1(
+        f"{market_question}|{round(yes_price, 2)}|{end_date}".encode()
+    ).hexdigest()
+    cached = get_llm_cache(cache_key, LLM_CACHE_TTL)
+    if cached:
+        return json.loads(cached)
+    
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = _get_openai_client()
         
         end_date_str = end_date if end_date else "Unknown"
         
@@ -306,18 +374,27 @@ Rules:
         
         # Clean up response (remove markdown if present)
         if content.startswith('```'):
-            content = re.sub(r'^```json?\s*', '', content)
-            content = re.sub(r'\s*```$', '', content)
+            content = content.removeprefix('```').removeprefix('json').lstrip()
+            content = content.removesuffix('```').rstrip()
         
         factors = json.loads(content)
         
-        # Validate required fields
-        required = ['base_rate_class', 'structural_feasibility', 'category', 'confidence_in_analysis']
-        for field in required:
-            if field not in factors:
-                logger.warning(f"Missing field in Claude response: {field}")
+        # Validate required fields and their types (calculate_mispricing relies on them)
+        if not isinstance(factors, dict):
+            logger.warning("Claude response is not a JSON object")
+            return None
+        for field, field_type in FACTOR_FIELD_TYPES.items():
+            if not isinstance(factors.get(field), field_type):
+                logger.warning(f"Missing or invalid field in Claude response: {field}")
                 return None
+        n_conditions = factors['structural_feasibility'].get('independent_conditions_required', 1)
+        # JSON replies often send counts as 3.0; accept any integral number
+        if not (isinstance(n_conditions, (int, float)) and float(n_conditions).is_integer()):
+            logger.warning("Invalid independent_conditions_required in Claude response")
+            return None
+        factors['structural_feasibility']['independent_conditions_required'] = int(n_conditions)
         
+        set_llm_cache(cache_key, json.dumps(factors))
         return factors
         
     except json.JSONDecodeError as e:
@@ -403,10 +480,8 @@ def calculate_mispricing(
     
     # Confidence discount: low confidence → widen estimate toward market
     confidence = factors.get('confidence_in_analysis', 'medium')
-    if confidence == 'low':
-        base = base * 0.6 + yes_price * 0.4  # Blend toward market
-    elif confidence == 'medium':
-        base = base * 0.8 + yes_price * 0.2
+    own_weight, market_weight = CONFIDENCE_BLEND.get(confidence, (1.0, 0.0))
+    base = base * own_weight + yes_price * market_weight
     
     # Cap rational estimate at 50% (we only trade longshots)
     rational_estimate = min(base, 0.50)
@@ -448,6 +523,49 @@ def calculate_mispricing(
 # COMBINED SIGNAL: INSIDER + IRRATIONALITY
 # ══════════════════════════════════════════════════════════════════
 
+# (position, pricing) -> (signal_type, emoji, interpretation, action_suggestion,
+#                         strength bonus, add irrationality score to strength)
+# pricing: MISPRICED (YES overpriced), UNDER (edge < 0) or NONE
+SIGNAL_TABLE = {
+    # 🔥 ALPHA — Smart money confirms mispricing
+    ('NO', 'MISPRICED'): (
+        "ALPHA", '🔥',
+        "Smart money (NO) confirms YES is overpriced",
+        "High conviction: insider + statistics aligned",
+        0, True
+    ),
+    # ⚠️ CONFLICT — Insider bullish on overpriced market (don't add irrationality)
+    ('YES', 'MISPRICED'): (
+        "CONFLICT", '⚠️',
+        "Insider buying YES despite statistical overpricing",
+        "Requires manual analysis: insider may have real info OR is part of irrational crowd",
+        0, False
+    ),
+    # 🚨 INSIDER_CONFIRMED — YES underpriced + insider buying (boost for alignment)
+    ('YES', 'UNDER'): (
+        "INSIDER_CONFIRMED", '🚨',
+        "Insider + underpricing aligned — likely real information",
+        "Follow the insider: market may be underpricing the event",
+        20, False
+    ),
+    # ❓ STRANGE — Insider selling underpriced YES
+    ('NO', 'UNDER'): (
+        "CONTRARIAN_INSIDER", '❓',
+        "Insider buying NO on potentially underpriced market",
+        "Unusual: insider may see risk not reflected in price",
+        0, False
+    ),
+}
+
+# Default: insider activity without clear mispricing signal
+INSIDER_ONLY_SIGNAL = (
+    "INSIDER_ONLY", '👁️',
+    "Insider activity detected, no clear mispricing",
+    "Monitor: insider signal only, no statistical edge",
+    0, False
+)
+
+
 def get_combined_signal(
     insider_score: int,
     insider_position: str,  # "YES" or "NO"
@@ -468,58 +586,23 @@ def get_combined_signal(
     edge = mispricing_data.get('edge', 0)
     irrationality_score = irrationality_data.get('irrationality_score', 0)
     
-    signal_type = None
-    signal_strength = 0
-    interpretation = ""
-    action_suggestion = ""
-    
-    if position == "NO" and is_mispriced:
-        # 🔥 ALPHA — Smart money confirms mispricing
-        signal_type = "ALPHA"
-        signal_strength = insider_score + irrationality_score
-        interpretation = "Smart money (NO) confirms YES is overpriced"
-        action_suggestion = "High conviction: insider + statistics aligned"
-        
-    elif position == "YES" and is_mispriced:
-        # ⚠️ CONFLICT — Insider bullish on overpriced market
-        signal_type = "CONFLICT"
-        signal_strength = insider_score  # Don't add irrationality (conflicting)
-        interpretation = "Insider buying YES despite statistical overpricing"
-        action_suggestion = "Requires manual analysis: insider may have real info OR is part of irrational crowd"
-        
-    elif position == "YES" and edge < 0:
-        # 🚨 INSIDER_CONFIRMED — YES underpriced + insider buying
-        signal_type = "INSIDER_CONFIRMED"
-        signal_strength = insider_score + 20  # Boost for alignment
-        interpretation = "Insider + underpricing aligned — likely real information"
-        action_suggestion = "Follow the insider: market may be underpricing the event"
-        
-    elif position == "NO" and edge < 0:
-        # ❓ STRANGE — Insider selling underpriced YES
-        signal_type = "CONTRARIAN_INSIDER"
-        signal_strength = insider_score
-        interpretation = "Insider buying NO on potentially underpriced market"
-        action_suggestion = "Unusual: insider may see risk not reflected in price"
-        
+    if is_mispriced:
+        pricing = 'MISPRICED'
+    elif edge < 0:
+        pricing = 'UNDER'
     else:
-        # Default: insider activity without clear mispricing signal
-        signal_type = "INSIDER_ONLY"
-        signal_strength = insider_score
-        interpretation = "Insider activity detected, no clear mispricing"
-        action_suggestion = "Monitor: insider signal only, no statistical edge"
-    
-    # Determine emoji
-    emoji_map = {
-        'ALPHA': '🔥',
-        'CONFLICT': '⚠️',
-        'INSIDER_CONFIRMED': '🚨',
-        'CONTRARIAN_INSIDER': '❓',
-        'INSIDER_ONLY': '👁️'
-    }
+        pricing = 'NONE'
+    
+    (signal_type, signal_emoji, interpretation, action_suggestion,
+     strength_bonus, add_irrationality) = SIGNAL_TABLE.get((position, pricing), INSIDER_ONLY_SIGNAL)
+    
+    signal_strength = insider_score + strength_bonus
+    if add_irrationality:
+        signal_strength += irrationality_score
     
     return {
         'signal_type': signal_type,
-        'signal_emoji': emoji_map.get(signal_type, '📊'),
+        'signal_emoji': signal_emoji,
         'signal_strength': signal_strength,
         'interpretation': interpretation,
         'action_suggestion': action_suggestion,
@@ -554,6 +637,9 @@ def analyze_market_irrationality(
     """
     logger.info(f"Analyzing market irrationality: {market_question[:60]}...")
     
+    # Classify once; both irrationality passes and the fallback factors use it
+    category = classify_category(market_question)
+    
     # Step 1a: Initial Irrationality Detection (without edge)
     irrationality_initial = calculate_irrationality_score(
         market_question=market_question,
@@ -561,14 +647,15 @@ def analyze_market_irrationality(
         volume_24h=volume_24h,
         volume_avg_30d=volume_avg_30d,
         price_change_24h=price_change_24h,
-        edge_percent=0  # First pass without edge
+        edge_percent=0,  # First pass without edge
+        category=category
     )
     
     # Get factors (Claude or fallback)
     factors = get_factors_with_fallback(
         market_question=market_question,
         yes_price=yes_price,
-        category=irrationality_initial['category']
+        category=category
     )
     
     # Step 2: Mispricing Confirmation
@@ -587,7 +674,8 @@ def analyze_market_irrationality(
             volume_24h=volume_24h,
             volume_avg_30d=volume_avg_30d,
             price_change_24h=price_change_24h,
-            edge_percent=edge_percent  # Second pass WITH edge
+            edge_percent=edge_percent,  # Second pass WITH edge
+            category=category
         )
     else:
         irrationality = irrationality_initial
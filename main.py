@@ -1,10 +1,30 @@
+import heapq
 import json
+import logging
+import os
+import sys
+import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
 
+from config import VERBOSE, ALERT_DEDUP_WINDOW
 from detector import detect_insider_trades
-from notifier import send_telegram_alert
+from notifier import send_telegram_alerts
+
+
+# Log prefix cache: (monotonic second, formatted timestamp)
+_ts_cache = (None, "")
+
+
+def _ts() -> str:
+    """Timestamp for log prefixes, formatted at most once per second."""
+    global _ts_cache
+    second = int(time.monotonic())
+    if _ts_cache[0] != second:
+        _ts_cache = (second, str(datetime.now()))
+    return _ts_cache[1]
 
 
 def load_tracked_wallets():
@@ -25,12 +45,39 @@ def load_tracked_wallets():
     return {"wallets": [], "trade_hashes": []}
 
 
+def _atomic_write_json(path: Path, data) -> None:
+    """
+    Write data as JSON to a temp file next to path, fsync it, then swap it in
+    with os.replace so a crash never leaves a half-written file.
+    The target keeps its permissions (0644 for a new file); on any failure the
+    temp file is removed.
+    """
+    # Serialise in one call and write once; json.dump streams many small chunks
+    payload = json.dumps(data, indent=2)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+        try:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            # NamedTemporaryFile creates 0600 files
+            os.fchmod(f.fileno(), mode)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
 def save_tracked_wallets(tracked_data):
-    path = Path("tracked_wallets.json")
-    temp_path = path.with_suffix(".tmp")
-    with open(temp_path, "w") as f:
-        json.dump(tracked_data, f, indent=2)
-    temp_path.replace(path)
+    _atomic_write_json(Path("tracked_wallets.json"), tracked_data)
 
 
 def load_alerts():
@@ -45,11 +92,7 @@ def load_alerts():
 
 
 def save_alerts(alerts):
-    path = Path("alerts.json")
-    temp_path = path.with_suffix(".tmp")
-    with open(temp_path, "w") as f:
-        json.dump(alerts, f, indent=2)
-    temp_path.replace(path)
+    _atomic_write_json(Path("alerts.json"), alerts)
 
 
 def _evaluate_financial_analyst_view(alert: Dict) -> Dict:
@@ -103,15 +146,52 @@ def _evaluate_financial_analyst_view(alert: Dict) -> Dict:
     }
 
 
-def _split_by_goals(alerts: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+def _alert_fingerprint(alert: Dict) -> str:
+    """Market, wallet, side and amount rounded to $1k: split fills of one bet collide."""
+    amount = alert.get("analysis", {}).get("amount", 0) or 0
+    return "|".join((
+        alert.get("market_slug") or alert.get("market") or "",
+        alert.get("wallet") or "",
+        str(alert.get("trade_data", {}).get("outcome", "")),
+        f"{round(amount, -3):.0f}",
+    ))
+
+
+def _split_by_goals(
+    alerts: List[Dict], tracked_hashes: Set[str], recent_fingerprints: Dict[str, float]
+) -> Tuple[List[Dict], List[Dict]]:
     """
     Goal 1: Find insiders.
     Goal 2: Find irrational trades worth copying.
+
+    Trades already alerted (in tracked_hashes), near-duplicates of an alert
+    sent within ALERT_DEDUP_WINDOW (recent_fingerprints) or repeated in this
+    batch are dropped first, so they get no analyst view and are not sent.
     """
     insiders: List[Dict] = []
     irrational_copy_candidates: List[Dict] = []
+    seen_hashes: Set[str] = set()
+    seen_fingerprints: Set[str] = set()
 
     for alert in alerts:
+        # Deduplicate by trade_hash (not wallet) - allows multiple alerts per wallet
+        trade_hash = alert.get("trade_hash", "")
+        if trade_hash:
+            if trade_hash in tracked_hashes or trade_hash in seen_hashes:
+                print(f"[{_ts()}] Trade {trade_hash[:12]}... already alerted, skipping")
+                continue
+            seen_hashes.add(trade_hash)
+
+        # One bet filled as several trades: same market/wallet/side/~amount.
+        # The detector has already marked every fill in alert_history, so a
+        # skipped fill is not re-detected next run; if the kept alert fails to
+        # send, the bet goes unreported, as any failed send already does.
+        fingerprint = _alert_fingerprint(alert)
+        if fingerprint in recent_fingerprints or fingerprint in seen_fingerprints:
+            print(f"[{_ts()}] Trade {trade_hash[:12]}... duplicates a recent alert, skipping")
+            continue
+        seen_fingerprints.add(fingerprint)
+
         combined = alert.get("combined_signal", {})
         mispricing = alert.get("mispricing", {})
 
@@ -139,20 +219,20 @@ def _split_by_goals(alerts: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
 
 
 def _print_goal_summary(insiders: List[Dict], irrational_copy_candidates: List[Dict]) -> None:
-    print(f"[{datetime.now()}] 🎯 Goal #1 (find insiders): {len(insiders)} signals")
+    print(f"[{_ts()}] 🎯 Goal #1 (find insiders): {len(insiders)} signals")
     print(
-        f"[{datetime.now()}] 🎯 Goal #2 (irrational trades to copy): "
+        f"[{_ts()}] 🎯 Goal #2 (irrational trades to copy): "
         f"{len(irrational_copy_candidates)} candidates"
     )
 
     if irrational_copy_candidates:
-        print(f"[{datetime.now()}] Top copy candidates (financial analyst view):")
-        sorted_candidates = sorted(
+        print(f"[{_ts()}] Top copy candidates (financial analyst view):")
+        top_candidates = heapq.nlargest(
+            5,
             irrational_copy_candidates,
             key=lambda x: x.get("financial_analyst", {}).get("signal_quality", 0),
-            reverse=True,
         )
-        for idx, candidate in enumerate(sorted_candidates[:5], start=1):
+        for idx, candidate in enumerate(top_candidates, start=1):
             fa = candidate.get("financial_analyst", {})
             sig = candidate.get("combined_signal", {})
             market = candidate.get("market", "Unknown market")
@@ -162,47 +242,66 @@ def _print_goal_summary(insiders: List[Dict], irrational_copy_candidates: List[D
             )
 
 
+def configure_logging():
+    """Send log records to stdout alongside print output; per-trade/alert detail is DEBUG."""
+    logging.basicConfig(stream=sys.stdout, format="%(message)s", level=logging.WARNING)
+    logging.getLogger("detector").setLevel(logging.DEBUG if VERBOSE else logging.INFO)
+    logging.getLogger("notifier").setLevel(logging.DEBUG if VERBOSE else logging.INFO)
+
+
 def main():
-    print(f"[{datetime.now()}] Starting Polymarket insider detector...")
+    configure_logging()
+    print(f"[{_ts()}] Starting Polymarket insider detector...")
 
+    # Lists keep file order (and are saved as-is); sets are for lookups
     tracked_data = load_tracked_wallets()
-    tracked_hashes = set(tracked_data.get("trade_hashes", []))
-    tracked_wallets = set(tracked_data.get("wallets", []))  # keep for stats
+    tracked_hash_list = list(dict.fromkeys(tracked_data.get("trade_hashes", [])))
+    tracked_wallet_list = list(dict.fromkeys(tracked_data.get("wallets", [])))  # keep for stats
+    tracked_hashes = set(tracked_hash_list)
+    tracked_wallets = set(tracked_wallet_list)
+    # Fingerprint -> epoch it was sent; expired ones are dropped on the next save
+    now = time.time()
+    recent_fingerprints = {
+        fp: sent_at for fp, sent_at in tracked_data.get("fingerprints", {}).items()
+        if now - sent_at < ALERT_DEDUP_WINDOW
+    }
     existing_alerts = load_alerts()
 
     new_alerts = detect_insider_trades()
-    insiders, irrational_copy_candidates = _split_by_goals(new_alerts)
+    insiders, irrational_copy_candidates = _split_by_goals(new_alerts, tracked_hashes, recent_fingerprints)
     _print_goal_summary(insiders, irrational_copy_candidates)
 
     sent_count = 0
-    for alert in insiders:
+    for alert, sent in zip(insiders, send_telegram_alerts(insiders)):
         trade_hash = alert.get("trade_hash", "")
         wallet = alert["wallet"]
 
-        # Deduplicate by trade_hash (not wallet) - allows multiple alerts per wallet
-        if trade_hash and trade_hash in tracked_hashes:
-            print(f"[{datetime.now()}] Trade {trade_hash[:12]}... already alerted, skipping")
-            continue
-
-        if send_telegram_alert(alert):
+        if sent:
             if trade_hash:
                 tracked_hashes.add(trade_hash)
-            tracked_wallets.add(wallet)
+                tracked_hash_list.append(trade_hash)
+            if wallet not in tracked_wallets:
+                tracked_wallets.add(wallet)
+                tracked_wallet_list.append(wallet)
+            recent_fingerprints[_alert_fingerprint(alert)] = time.time()
             existing_alerts.append(alert)
             sent_count += 1
-            print(f"[{datetime.now()}] ✅ Alert sent for trade {trade_hash[:12]}... (wallet {wallet[:8]}...)")
+            print(f"[{_ts()}] ✅ Alert sent for trade {trade_hash[:12]}... (wallet {wallet[:8]}...)")
         else:
-            print(f"[{datetime.now()}] ❌ Failed to send alert for {wallet[:8]}...")
-
-    tracked_data = {
-        "wallets": list(tracked_wallets),
-        "trade_hashes": list(tracked_hashes),
-    }
-    save_tracked_wallets(tracked_data)
-    save_alerts(existing_alerts)
+            print(f"[{_ts()}] ❌ Failed to send alert for {wallet[:8]}...")
+
+    # Nothing sent means nothing new to track - skip rewriting both files
+    if sent_count:
+        tracked_data = {
+            "wallets": tracked_wallet_list,
+            "trade_hashes": tracked_hash_list,
+            "fingerprints": recent_fingerprints,
+        }
+        save_tracked_wallets(tracked_data)
+        save_alerts(existing_alerts)
 
     print(
-        f"[{datetime.now()}] Completed. "
+        f"[{_ts()}] Completed. "
         f"Insider signals: {len(insiders)}, copy candidates: {len(irrational_copy_candidates)}, "
         f"alerts sent: {sent_count}"
     )
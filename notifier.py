@@ -1,25 +1,62 @@
 # VERSION: 2026-01-31-HOTFIX-17:15-UTC
 # CRITICAL FIX: NO position calculation
-# Force reload to clear any cached bytecode
-import sys
-sys.dont_write_bytecode = True
-
-# Debug flag - will print calculation details to logs
-DEBUG_CALCULATIONS = True
+import logging
 
 import requests
-from openai import OpenAI
-import openai
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, OPENAI_API_KEY
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, OPENAI_API_KEY, TELEGRAM_SEND_WORKERS
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from functools import lru_cache
-import hashlib
+
+# Calculation details are logged at DEBUG (enabled with DETECTOR_VERBOSE=1)
+logger = logging.getLogger(__name__)
+
+_TELEGRAM_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+
+# Reused across alerts so the Telegram/OpenAI HTTPS connections stay open.
+# sendMessage is not idempotent, so POST is only retried when Telegram surely
+# did not take the message: connect errors (nothing sent) and 429 throttling
+# (honouring Retry-After). Read errors and 5xx from a proxy may follow an
+# accepted send, so they are never retried.
+_telegram_session = requests.Session()
+_telegram_session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=TELEGRAM_SEND_WORKERS,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=0,
+        other=0,
+        backoff_factor=0.3,
+        status_forcelist=(429,),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False
+    )
+))
+_openai_client = None
+
+def _get_openai_client():
+    """Shared OpenAI client, created on first use (SDK imported lazily, AI summaries are optional)."""
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=2, timeout=15.0)
+    return _openai_client
+
+# Outcome labels as the data API sends them (fast path before substring checks)
+_OUTCOME_POSITIONS = {'Yes': 'YES', 'No': 'NO', 'YES': 'YES', 'NO': 'NO', 'yes': 'YES', 'no': 'NO'}
 
 def determine_position(trade_data, odds):
     """Determine YES/NO position from trade data"""
     if trade_data:
         outcome = trade_data.get('outcome')
         if outcome:
+            position = _OUTCOME_POSITIONS.get(outcome) if isinstance(outcome, str) else None
+            if position:
+                return position
             outcome_lower = str(outcome).lower()
             if 'yes' in outcome_lower:
                 return 'YES'
@@ -31,10 +68,6 @@ def determine_position(trade_data, odds):
 
 def format_trade_info(alert):
     """Format trade information with correct profit calculation"""
-    # Print version to confirm this code is running
-    if DEBUG_CALCULATIONS:
-        print(f"[DEBUG] format_trade_info() called - VERSION: 2026-01-31-HOTFIX-17:15-UTC")
-    
     analysis = alert["analysis"]
     trade_data = alert.get("trade_data", {})
     
@@ -46,28 +79,31 @@ def format_trade_info(alert):
     position = determine_position(trade_data, odds)
     is_estimated = position.startswith('~')
     
+    # Price of the side actually bought; cents computed once for prob and display
     if 'YES' in position:
-        implied_prob = yes_price * 100
-        tokens_bought = amount / yes_price if yes_price > 0 else 0
-        payout_if_win = tokens_bought * 1.0
-        potential_profit = payout_if_win - amount
-        position_display = f"YES @ {yes_price*100:.1f}¢"
+        side, price = 'YES', yes_price
     else:
-        implied_prob = no_price * 100
-        tokens_bought = amount / no_price if no_price > 0 else 0
-        payout_if_win = tokens_bought * 1.0
-        potential_profit = payout_if_win - amount
-        position_display = f"NO @ {no_price*100:.1f}¢"
-        
-        # DEBUG: Print calculation details
-        if DEBUG_CALCULATIONS:
-            print(f"[DEBUG] NO POSITION CALCULATION:")
-            print(f"  YES price (odds): {yes_price:.4f} ({yes_price*100:.1f}¢)")
-            print(f"  NO price: {no_price:.4f} ({no_price*100:.1f}¢)")
-            print(f"  Amount: ${amount:,.0f}")
-            print(f"  Tokens bought: {tokens_bought:,.0f}")
-            print(f"  Potential profit: ${potential_profit:,.0f}")
-            print(f"  Position display: {position_display}")
+        side, price = 'NO', no_price
+    implied_prob = price * 100
+    tokens_bought = amount / price if price > 0 else 0
+    payout_if_win = tokens_bought * 1.0
+    potential_profit = payout_if_win - amount
+    position_display = f"{side} @ {implied_prob:.1f}¢"
+    
+    if side == 'NO':
+        # DEBUG: Log calculation details (formatted only when DEBUG is enabled)
+        logger.debug(
+            "[DEBUG] NO POSITION CALCULATION:\n"
+            "  YES price (odds): %.4f (%.1f¢)\n"
+            "  NO price: %.4f (%.1f¢)\n"
+            "  Amount: $%s\n"
+            "  Tokens bought: %s\n"
+            "  Potential profit: $%s\n"
+            "  Position display: %s",
+            yes_price, yes_price * 100, no_price, implied_prob,
+            format(amount, ',.0f'), format(tokens_bought, ',.0f'),
+            format(potential_profit, ',.0f'), position_display
+        )
     
     if is_estimated:
         position_display += " ⚠️"
@@ -95,6 +131,32 @@ def format_trade_info(alert):
         'tokens': f"{tokens_bought:,.0f}"
     }
 
+WALLET_EMOJI = {
+    'Probable Insider': '🔴',
+    'Syndicate/Whale': '🟠',
+    'Professional': '🟡',
+    'Retail': '🟢',
+    'New': '🆕'
+}
+
+SEVERITY_EMOJI = {
+    'CRITICAL': '🚨🚨🚨',
+    'HIGH': '🚨🚨',
+    'MEDIUM': '🚨',
+    'LOW': '⏰'
+}
+
+# Footer timestamp (UTC)
+_TIMESTAMP_FMT = '%Y-%m-%d %H:%M'
+
+# Alert header text per signal type (anything else: INSIDER ACTIVITY)
+SIGNAL_HEADERS = {
+    'ALPHA': "ALPHA SIGNAL — Insider + Mispricing Aligned",
+    'CONFLICT': "CONFLICT — Insider vs Statistics",
+    'INSIDER_CONFIRMED': "INSIDER CONFIRMED — Real Information Likely",
+    'CONTRARIAN_INSIDER': "CONTRARIAN — Unusual Insider Behavior"
+}
+
 def format_wallet_classification(wallet_stats: Optional[Dict]) -> str:
     """Format wallet classification with emoji"""
     if not wallet_stats:
@@ -103,15 +165,7 @@ def format_wallet_classification(wallet_stats: Optional[Dict]) -> str:
     classification = wallet_stats.get('classification', 'Unknown')
     insider_score = wallet_stats.get('insider_score', 0)
     
-    emoji_map = {
-        'Probable Insider': '🔴',
-        'Syndicate/Whale': '🟠',
-        'Professional': '🟡',
-        'Retail': '🟢',
-        'New': '🆕'
-    }
-    
-    emoji = emoji_map.get(classification, '⚪')
+    emoji = WALLET_EMOJI.get(classification, '⚪')
     return f"{emoji} {classification} (Score: {insider_score:.0f}/100)"
 
 def format_latency_alert(latency: Optional[Dict]) -> str:
@@ -122,27 +176,38 @@ def format_latency_alert(latency: Optional[Dict]) -> str:
     minutes = abs(latency['latency_minutes'])
     severity = latency['severity']
     
-    severity_emoji = {
-        'CRITICAL': '🚨🚨🚨',
-        'HIGH': '🚨🚨',
-        'MEDIUM': '🚨',
-        'LOW': '⏰'
-    }
-    
-    emoji = severity_emoji.get(severity, '⏰')
+    emoji = SEVERITY_EMOJI.get(severity, '⏰')
     
     return f"\n{emoji} PRE-EVENT DETECTED: {minutes:.0f} minutes BEFORE event"
 
+# Static part of the AI summary prompt. Sent first (as the system message) so
+# every request shares an identical prefix for OpenAI's prompt caching.
+_AI_SUMMARY_INSTRUCTIONS = """Analyze this Polymarket trade in ONE concise sentence (max 15 words).
+
+Focus on the SPECIFIC insight, not generic patterns. Be direct and actionable.
+
+Good examples:
+- "Unusual pre-event timing suggests advance knowledge of announcement"
+- "Pattern matches previous insider trades from this wallet"
+- "Coordinated timing with other large bets indicates organized group"
+
+Bad examples (too generic):
+- "Large bet suggests potential insider information"
+- "Extreme confidence may indicate knowledge"
+"""
+
 @lru_cache(maxsize=100)
-def generate_ai_summary_cached(cache_key: str, market: str, position: str, amount: str, 
+def generate_ai_summary_cached(market: str, position: str, amount: str,
                                 wallet_info: str, latency_info: str):
     """
-    Cached AI summary generation.
+    Cached AI summary generation (keyed on the argument tuple).
     FIX ISSUE #14: Rate limiting with caching.
     FIX ISSUE #12: Improved error handling.
     """
+    import openai  # deferred with the client; needed for the except clauses below
+    
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = _get_openai_client()
         
         # Build context
         context = f"Market: {market}\n"
@@ -155,30 +220,27 @@ def generate_ai_summary_cached(cache_key: str, market: str, position: str, amoun
         if latency_info:
             context += f"Timing: {latency_info}\n"
         
-        prompt = f"""Analyze this Polymarket trade in ONE concise sentence (max 15 words).
-
-{context}
-
-Focus on the SPECIFIC insight, not generic patterns. Be direct and actionable.
-
-Good examples:
-- "Unusual pre-event timing suggests advance knowledge of announcement"
-- "Pattern matches previous insider trades from this wallet"
-- "Coordinated timing with other large bets indicates organized group"
-
-Bad examples (too generic):
-- "Large bet suggests potential insider information"
-- "Extreme confidence may indicate knowledge"
-
-Write ONE specific insight (max 15 words):"""
-
+        messages = [
+            {"role": "system", "content": _AI_SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": f"{context}\nWrite ONE specific insight (max 15 words):"}
+        ]
+        
         response = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             max_tokens=80,
             temperature=0.5
         )
         
+        # Server-side prompt cache visibility (cached_tokens is 0 below 1024 prompt tokens)
+        usage = response.usage
+        if usage:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            logger.debug(
+                "AI summary tokens: prompt=%d cached=%d completion=%d",
+                usage.prompt_tokens, getattr(details, 'cached_tokens', 0) or 0, usage.completion_tokens
+            )
+        
         summary = response.choices[0].message.content.strip()
         
         # Remove quotes if AI added them
@@ -194,12 +256,14 @@ Write ONE specific insight (max 15 words):"""
         print(f"Error generating AI summary: {e}")
         return "High-probability insider signal detected"
 
-def generate_ai_summary(alert):
+def generate_ai_summary(alert, trade_info: Optional[Dict] = None):
     """
     Generate AI analysis with caching.
     FIX ISSUE #14: Cache identical alerts to reduce API costs.
+    Pass trade_info if format_trade_info() was already run for this alert.
     """
-    trade_info = format_trade_info(alert)
+    if trade_info is None:
+        trade_info = format_trade_info(alert)
     wallet_stats = alert.get('wallet_stats')
     latency = alert.get('latency')
     
@@ -213,13 +277,7 @@ def generate_ai_summary(alert):
     if latency and latency.get('is_pre_event'):
         latency_info = f"{latency['latency_minutes']:.0f} minutes BEFORE event"
     
-    # Create cache key
-    cache_key = hashlib.md5(
-        f"{alert['market']}:{trade_info['position']}:{trade_info['amount']}:{wallet_info}:{latency_info}".encode()
-    ).hexdigest()
-    
     return generate_ai_summary_cached(
-        cache_key,
         alert['market'],
         trade_info['position'],
         trade_info['amount'],
@@ -227,7 +285,7 @@ def generate_ai_summary(alert):
         latency_info
     )
 
-def format_institutional_alert(alert):
+def format_institutional_alert(alert, trade_info: Optional[Dict] = None):
     """
     Format alert in institutional-grade style with irrationality analysis.
     
@@ -236,11 +294,12 @@ def format_institutional_alert(alert):
     - ⚠️ CONFLICT: Insider YES + market overpriced
     - 🚨 INSIDER_CONFIRMED: Insider YES + market underpriced
     - 👁️ INSIDER_ONLY: Insider activity without clear mispricing
-    """
-    from datetime import datetime, timezone
     
+    Pass trade_info if format_trade_info() was already run for this alert.
+    """
     analysis = alert["analysis"]
-    trade_info = format_trade_info(alert)
+    if trade_info is None:
+        trade_info = format_trade_info(alert)
     wallet_stats = alert.get('wallet_stats')
     latency = alert.get('latency')
     
@@ -254,16 +313,7 @@ def format_institutional_alert(alert):
     signal_strength = combined_signal.get('signal_strength', analysis.get('score', 0))
     
     # Determine header based on signal type
-    if signal_type == "ALPHA":
-        header = f"{signal_emoji} ALPHA SIGNAL — Insider + Mispricing Aligned"
-    elif signal_type == "CONFLICT":
-        header = f"{signal_emoji} CONFLICT — Insider vs Statistics"
-    elif signal_type == "INSIDER_CONFIRMED":
-        header = f"{signal_emoji} INSIDER CONFIRMED — Real Information Likely"
-    elif signal_type == "CONTRARIAN_INSIDER":
-        header = f"{signal_emoji} CONTRARIAN — Unusual Insider Behavior"
-    else:
-        header = f"{signal_emoji} INSIDER ACTIVITY"
+    header = f"{signal_emoji} {SIGNAL_HEADERS.get(signal_type, 'INSIDER ACTIVITY')}"
     
     # Market category
     category = irrationality.get('category', 'other')
@@ -293,34 +343,33 @@ def format_institutional_alert(alert):
     else:
         lead_time = "N/A"
     
-    # Build message
-    message = f"""{header}
-Category: {category_display}
-
-Market: {alert['market']}
-YES: {yes_price*100:.0f}¢ | NO: {no_price*100:.0f}¢
-
-INSIDER ACTIVITY
-Wallet: {alert['wallet'][:10]}...{alert['wallet'][-8:]}
-Bet: {trade_info['amount']} {trade_info['position']}
-Lead Time: {lead_time}
-Profile: {profile}"""
+    # Build message (collect lines, join once)
+    parts = [
+        header,
+        f"Category: {category_display}",
+        "",
+        f"Market: {alert['market']}",
+        f"YES: {yes_price*100:.0f}¢ | NO: {no_price*100:.0f}¢",
+        "",
+        "INSIDER ACTIVITY",
+        f"Wallet: {alert['wallet'][:10]}...{alert['wallet'][-8:]}",
+        f"Bet: {trade_info['amount']} {trade_info['position']}",
+        f"Lead Time: {lead_time}",
+        f"Profile: {profile}"
+    ]
     
     # Historical performance
     if wallet_stats and wallet_stats.get('total_trades', 0) >= 1:
         total = wallet_stats['total_trades']
         pre_event = wallet_stats.get('pre_event_trades', 0)
-        message += f"\nHistory: {total} trades | {pre_event} pre-event"
+        parts.append(f"History: {total} trades | {pre_event} pre-event")
     
     # Irrationality analysis section
     irr_score = irrationality.get('irrationality_score', 0)
     irr_flags = irrationality.get('flags', [])
     
-    message += f"\n\nIRRATIONALITY ANALYSIS"
-    message += f"\nScore: {irr_score}/100"
-    
-    for flag in irr_flags[:3]:  # Max 3 flags
-        message += f"\n• {flag}"
+    parts += ["", "IRRATIONALITY ANALYSIS", f"Score: {irr_score}/100"]
+    parts += [f"• {flag}" for flag in irr_flags[:3]]  # Max 3 flags
     
     # Mispricing analysis section  
     edge = mispricing.get('edge_percent', 0)
@@ -328,46 +377,41 @@ Profile: {profile}"""
     edge_quality = mispricing.get('edge_quality', 'NONE')
     is_mispriced = mispricing.get('is_mispriced', False)
     
-    message += f"\n\nMISPRICING ANALYSIS"
-    
-    if is_mispriced:
-        message += f"\n✅ CONFIRMED"
-    else:
-        message += f"\n❌ NOT CONFIRMED"
-    
-    message += f"\nRational estimate: ~{rational_est*100:.0f}%"
-    message += f"\nMarket price: {yes_price*100:.0f}%"
-    message += f"\nEdge: {edge:+.1f}% ({edge_quality})"
+    parts += [
+        "",
+        "MISPRICING ANALYSIS",
+        "✅ CONFIRMED" if is_mispriced else "❌ NOT CONFIRMED",
+        f"Rational estimate: ~{rational_est*100:.0f}%",
+        f"Market price: {yes_price*100:.0f}%",
+        f"Edge: {edge:+.1f}% ({edge_quality})"
+    ]
     
     # Combined signal interpretation
     interpretation = combined_signal.get('interpretation', '')
     action = combined_signal.get('action_suggestion', '')
     
-    message += f"\n\nSIGNAL"
-    message += f"\nType: {signal_type}"
-    message += f"\nStrength: {signal_strength}/250"
-    message += f"\n{interpretation}"
+    parts += ["", "SIGNAL", f"Type: {signal_type}", f"Strength: {signal_strength}/250", interpretation]
     
     if action:
-        message += f"\n\n💡 {action}"
+        parts += ["", f"💡 {action}"]
     
     # Suspicion factors from insider analysis
     flags = analysis.get('flags', [])[:3]
     if flags:
-        message += f"\n\nINSIDER FLAGS"
-        for flag in flags:
-            message += f"\n• {flag}"
+        parts += ["", "INSIDER FLAGS"]
+        parts += [f"• {flag}" for flag in flags]
     
     # Footer
     market_slug = alert.get('market_slug', '')
-    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')
+    timestamp = datetime.now(timezone.utc).strftime(_TIMESTAMP_FMT)
     
-    message += f"\n\nSource: https://polymarket.com/event/{market_slug}"
-    message += f"\nRadar | {timestamp} UTC"
+    parts += ["", f"Source: https://polymarket.com/event/{market_slug}", f"Radar | {timestamp} UTC"]
     
     # Estimation warning
     if trade_info.get('is_estimated'):
-        message += f"\n\n⚠️ Position estimated from odds"
+        parts += ["", "⚠️ Position estimated from odds"]
+    
+    message = "\n".join(parts)
     
     # Truncate if needed
     if len(message) > 4000:
@@ -382,31 +426,22 @@ def send_telegram_alert(alert):
     """
     try:
         message = format_institutional_alert(alert)
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        # Plain text: the message uses no Markdown, and Markdown mode rejected
+        # alerts with stray _ or * (wallet flags, market titles) anyway
         payload = {
             "chat_id": TELEGRAM_CHAT_ID,
             "text": message,
-            "disable_web_page_preview": False,
-            "parse_mode": "Markdown"
+            "disable_web_page_preview": False
         }
         
-        response = requests.post(url, json=payload, timeout=10)
+        response = _telegram_session.post(_TELEGRAM_URL, json=payload, timeout=10)
         response.raise_for_status()
         print(f"✓ Alert sent successfully")
         return True
         
     except requests.exceptions.HTTPError as e:
-        # Markdown parsing failed, try without markdown
-        print(f"⚠️  Markdown parsing failed, retrying without formatting: {e}")
-        try:
-            payload["parse_mode"] = None
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            print(f"✓ Alert sent (without markdown)")
-            return True
-        except Exception as e2:
-            print(f"❌ Alert sending failed completely: {e2}")
-            return False
+        print(f"❌ Telegram API rejected alert: {e}")
+        return False
             
     except requests.exceptions.Timeout:
         print(f"❌ Telegram API timeout")
@@ -419,3 +454,14 @@ def send_telegram_alert(alert):
     except Exception as e:
         print(f"❌ Unexpected error sending alert: {e}")
         return False
+
+def send_telegram_alerts(alerts: List[Dict]) -> List[bool]:
+    """
+    Send several alerts concurrently (network-bound, so threads overlap the waits).
+    Returns one success flag per alert, in input order.
+    """
+    if len(alerts) <= 1:
+        return [send_telegram_alert(alert) for alert in alerts]
+    
+    with ThreadPoolExecutor(max_workers=min(TELEGRAM_SEND_WORKERS, len(alerts))) as executor:
+        return list(executor.map(send_telegram_alert, alerts))
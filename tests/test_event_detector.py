@@ -0,0 +1,51 @@
+"""
+Regression tests for title date parsing in event_detector_fixed.
+
+Run with: python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from event_detector_fixed import _extract_date_parts  # noqa: E402
+
+
+class TitleDatePartsTest(unittest.TestCase):
+    """(year, month, day) from market titles; year is None for month-name dates."""
+
+    def test_price_prefixed_titles(self):
+        # The tail of a price must not be read as a day before the month name
+        cases = {
+            "Will Bitcoin dip to $88,000 January 12-18?": (None, 1, 12),
+            "Will Solana dip to $120 January 12-18?": (None, 1, 12),
+            "Will ETH reach $4,000 by December 31?": (None, 12, 31),
+            "Will BTC dip to $1.5 March 28?": (None, 3, 28),
+            "Will XRP be above $0.25 Dec 22?": (None, 12, 22),
+            "Ethereum above 3000 on March 5?": (None, 3, 5),
+        }
+        for title, expected in cases.items():
+            with self.subTest(title=title):
+                self.assertEqual(_extract_date_parts(title), expected)
+
+    def test_month_name_formats(self):
+        self.assertEqual(_extract_date_parts("Fed decision on Jan 28?"), (None, 1, 28))
+        self.assertEqual(_extract_date_parts("Will X happen by 19 January?"), (None, 1, 19))
+        self.assertEqual(_extract_date_parts("Will X happen by 19 Jan?"), (None, 1, 19))
+        self.assertEqual(_extract_date_parts("Strike by September 5?"), (None, 9, 5))
+
+    def test_month_name_must_be_whole_word(self):
+        self.assertIsNone(_extract_date_parts("Will Omar 5 win?"))
+        self.assertIsNone(_extract_date_parts("Bitcoin above 100k?"))
+
+    def test_invalid_day_is_rejected(self):
+        self.assertIsNone(_extract_date_parts("Will BTC dip to $120 June 31?"))
+
+    def test_numeric_dates(self):
+        self.assertEqual(_extract_date_parts("Event on 2026-01-19"), (2026, 1, 19))
+        self.assertEqual(_extract_date_parts("Event on 19.01.2026"), (2026, 1, 19))
+
+
+if __name__ == "__main__":
+    unittest.main()